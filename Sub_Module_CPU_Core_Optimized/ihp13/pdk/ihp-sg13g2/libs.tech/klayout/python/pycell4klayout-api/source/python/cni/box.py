@@ -26,6 +26,8 @@ import pya
 
 class Box(object):
 
+    __slots__ = ('box', '__rect')
+
     def __init__(self, l = INT_MAX, b = INT_MAX, r = INT_MIN, t = INT_MIN):
         self.box = pya.DBox(l, b, r, t)
 
@@ -64,8 +66,7 @@ class Box(object):
 
     def destroy(self):
         if not self.box._destroyed():
-            import cni.shape
-            cni.shape.Shape.getCell().shapes(self.__rect.getShape().layer).erase(self.__rect.getShape())
+            self.__rect._eraseShape()
             self.box._destroy()
         else:
             pya.Logger.warn(f"Box.destroy: already destroyed!")
@@ -193,12 +194,8 @@ class Box(object):
         raise Exception("Not implemented yet!")
 
     def moveBy(self, dx: float, dy: float) -> None:
-        movedBox = pya.DTrans(dx, dy) * self.box
-        import cni.shape
-        shape = cni.shape.Shape.getCell().shapes(self.__rect._shape.layer).insert(movedBox)
-        self.destroy()
-        self.__rect._shape = shape
-        self.box = movedBox
+        self.box = pya.DTrans(float(dx), float(dy)) * self.box
+        self.__rect._replaceShape(self.box)
 
     def moveTo(self, destination, loc = Location.CENTER_CENTER):
         raise Exception("Not implemented yet!")
@@ -300,12 +297,8 @@ class Box(object):
         if self.__rect is None:
             raise Exception("No rect set for box!")
 
-        transformedBox = self.box.transformed(transform.transform)
-        import cni.shape
-        shape = cni.shape.Shape.getCell().shapes(self.__rect._shape.layer).insert(transformedBox)
-        self.destroy()
-        self.__rect._shape = shape
-        self.box = transformedBox
+        self.box = self.box.transformed(transform.transform)
+        self.__rect._replaceShape(self.box)
 
     def upperCenter(self):
         raise Exception("Not implemented yet!")
@@ -42,11 +42,13 @@ from cni.term import *
 from cni.path import *
 from cni.shapefilter import *
 from cni.net import *
+from cni.profiler import PCellProfiler
 
 import pya
 
 import sys
 import traceback
+import collections
 
 class ChoiceConstraint(list):
 
@@ -78,10 +80,23 @@ class RangeConstraint:
 
 
 class PyCellContext(object):
+    """
+    Context of the layout generation of a PyCell.
+
+    In buffered emission mode (the default) the shapes created by the cni classes aren't inserted
+    into the cell one at a time: they are converted to database units and collected per layer,
+    then inserted in bulk when the context is left. A shape is inserted on its own beforehand if
+    its pya.Shape is needed (see Shape.getShape), and a shape erased before it was inserted is
+    just dropped.
+
+    """
 
     # stack of PyCellContext for cell hierarchy
     _pyCellContexts = []
 
+    # defer the insertion of shapes until the context is left
+    bufferedEmission = True
+
     @classmethod
     def getCurrentPyCellContext(cls) -> PyCellContext:
         if len(cls._pyCellContexts) == 0:
@@ -93,11 +108,13 @@ class PyCellContext(object):
         self._tech = tech
         self._cell = cell
         self._impl = impl
+        self._pendingShapes = {}
 
     def __enter__(self):
         Layer.layout = self._cell.layout()
 
     def __exit__(self, *params):
+        self.flushShapes()
         PyCellContext._pyCellContexts.pop()
         Layer.layout = None
         self._cell = None
@@ -110,6 +127,109 @@ class PyCellContext(object):
             raise Exception("Cell not set!")
         return self._cell
 
+    def emitShape(self, shape, layer: int, obj) -> None:
+        """
+        Registers 'obj' (a pya.DBox, DSimplePolygon, DPath or DText) as pending shape of 'shape'
+        on the layer with index 'layer'.
+
+        """
+        self._pendingShapes[id(shape)] = (shape, layer, obj.to_itype(self._cell.layout().dbu))
+
+    def emitRegion(self, owner, layer: int, region: pya.Region) -> None:
+        """
+        Registers the polygons of 'region' (in database units) as pending shapes of 'owner' on the
+        layer with index 'layer'.
+
+        """
+        self._pendingShapes[id(owner)] = (owner, layer, region)
+
+    @classmethod
+    def _findPendingContext(cls, shape) -> PyCellContext:
+        for pyCellContext in reversed(cls._pyCellContexts):
+            if id(shape) in pyCellContext._pendingShapes:
+                return pyCellContext
+        return None
+
+    @classmethod
+    def findPendingShape(cls, shape) -> tuple:
+        """
+        Returns the tuple (layer, obj) if 'shape' is pending, otherwise None.
+
+        """
+        pyCellContext = cls._findPendingContext(shape)
+        if pyCellContext is None:
+            return None
+        return pyCellContext._pendingShapes[id(shape)][1:]
+
+    @classmethod
+    def takePendingShape(cls, shape) -> tuple:
+        """
+        Removes 'shape' from the pending shapes without inserting it. Returns the tuple (layer, obj)
+        if 'shape' was pending, otherwise None.
+
+        """
+        pyCellContext = cls._findPendingContext(shape)
+        if pyCellContext is None:
+            return None
+        return pyCellContext._pendingShapes.pop(id(shape))[1:]
+
+    @classmethod
+    def replacePendingShape(cls, shape, obj) -> bool:
+        """
+        Replaces the pending object of 'shape' by 'obj' (see emitShape), keeping its layer and its
+        place in the pending shapes. Returns False if 'shape' isn't pending.
+
+        """
+        pyCellContext = cls._findPendingContext(shape)
+        if pyCellContext is None:
+            return False
+        _, layer, _ = pyCellContext._pendingShapes[id(shape)]
+        pyCellContext._pendingShapes[id(shape)] = (shape, layer, obj.to_itype(pyCellContext._cell.layout().dbu))
+        return True
+
+    @classmethod
+    def insertPendingShape(cls, shape) -> None:
+        """
+        Inserts 'shape' into its cell right away if it is pending.
+
+        """
+        pyCellContext = cls._findPendingContext(shape)
+        if pyCellContext is not None:
+            _, layer, obj = pyCellContext._pendingShapes.pop(id(shape))
+            shape.set_shape(pyCellContext._cell.shapes(layer).insert(obj))
+
+    def flushShapes(self) -> None:
+        """
+        Inserts the pending shapes into the cell: boxes, polygons and regions via one pya.Region and
+        texts via one pya.Texts per layer, paths one by one.
+
+        """
+        if len(self._pendingShapes) == 0:
+            return
+
+        layers = {}
+        for _, layer, obj in self._pendingShapes.values():
+            layers.setdefault(layer, []).append(obj)
+        self._pendingShapes = {}
+
+        for layer, objs in layers.items():
+            cellShapes = self._cell.shapes(layer)
+            polygons = []
+            texts = []
+            for obj in objs:
+                if type(obj) is pya.Text:
+                    texts.append(obj)
+                elif type(obj) is pya.Path:
+                    cellShapes.insert(obj)
+                elif type(obj) is pya.Region:
+                    polygons.extend(poly.to_simple_polygon() for poly in obj.each())
+                else:
+                    polygons.append(obj)
+            if len(polygons) > 0:
+                cellShapes.insert(pya.Region(polygons))
+            if len(texts) > 0:
+                cellShapes.insert(pya.Texts(texts))
+
     @property
     def tech(self):
         if self._tech is None:
@@ -135,8 +255,110 @@ class PyCellContext(object):
         return self._cell
 
 
+class PCellGeometryCache(object):
+    """
+    LRU cache of the layouts produced by the PCellWrappers of a session.
+
+    An entry is keyed by the PCell, the database unit and the canonicalized parameter values: the
+    values of parameters declared as double are normalized to 12 significant digits, all other
+    values are used as they are. A PyCell which parses string or int parameters as numbers can list
+    them in its class attribute 'numericParams', their values representing numbers (like '2u') are
+    normalized as well, so '2u' and 2e-6 are the same key. Values which don't represent a number
+    are used as they are.
+
+    An entry holds a copy of the shapes of each layer of the produced cell, which are replayed
+    into the target cell on a hit. Cells containing instances aren't cached.
+
+    """
+
+    def __init__(self, maxSize: int = 128):
+        self._maxSize = maxSize
+        self._entries = collections.OrderedDict()
+
+    @property
+    def maxSize(self) -> int:
+        return self._maxSize
+
+    @maxSize.setter
+    def maxSize(self, maxSize: int):
+        self._maxSize = maxSize
+        while len(self._entries) > max(maxSize, 0):
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def canonicalValue(value, numeric: bool = False):
+        if type(value) is bool or value is None or not numeric:
+            return value
+        if type(value) is str:
+            try:
+                value = Numeric(value.strip())
+            except ValueError:
+                return value
+        return f"{float(value):.12g}"
+
+    @staticmethod
+    def canonicalParams(paramDecls: list, values: list, numericParams = ()) -> tuple:
+        return tuple(PCellGeometryCache.canonicalValue(value, paramDecl.type == pya.PCellParameterDeclaration.TypeDouble
+                                                              or paramDecl.name in numericParams)
+                     for paramDecl, value in zip(paramDecls, values))
+
+    def key(self, pcell, dbu: float, params: tuple):
+        return (id(pcell), dbu) + params
+
+    def replay(self, key, cell) -> bool:
+        """
+        Inserts the shapes cached for 'key' into 'cell'. Returns False on a cache miss.
+
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+
+        self._entries.move_to_end(key)
+
+        layout = cell.layout()
+        for layerInfo, shapes in entry:
+            cell.shapes(layout.layer(layerInfo)).insert(shapes)
+
+        return True
+
+    def capture(self, key, cell):
+        """
+        Stores a copy of the shapes of 'cell' for 'key', evicting the least recently used entries.
+
+        """
+        if self._maxSize <= 0 or cell.child_instances() > 0:
+            return
+
+        layout = cell.layout()
+        entry = []
+        for layerIndex in layout.layer_indexes():
+            cellShapes = cell.shapes(layerIndex)
+            if not cellShapes.is_empty():
+                shapes = pya.Shapes()
+                shapes.insert(cellShapes)
+                entry.append((layout.get_info(layerIndex), shapes))
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+
+
 class PCellWrapper(pya.PCellDeclaration):
 
+    # geometry produced in this session, shared by all PCells
+    geometryCache = PCellGeometryCache()
+
+    # optional PCellVariantStore shared across sessions (see variantstore.py)
+    variantStore = None
+
     def __init__(self, impl, tech, preProcPath = None, origPath = None):
         super(PCellWrapper, self).__init__()
 
@@ -188,6 +410,40 @@ class PCellWrapper(pya.PCellDeclaration):
 
         self.param_decls.append(param_decl)
 
+    def paramSpecs(self) -> list:
+        """
+        Returns the parameter declarations as a list of plain dicts, suitable for serialization
+        and for creating a LazyPCellWrapper.
+
+        """
+        specs = []
+        for param_decl in self.param_decls:
+            spec = {
+                'name': param_decl.name,
+                'type': param_decl.type,
+                'description': param_decl.description,
+                'default': param_decl.default
+            }
+            if len(param_decl.choice_values()) > 0:
+                spec['choices'] = list(zip(param_decl.choice_descriptions(), param_decl.choice_values()))
+            if param_decl.min_value is not None:
+                spec['min'] = param_decl.min_value
+            if param_decl.max_value is not None:
+                spec['max'] = param_decl.max_value
+            specs.append(spec)
+        return specs
+
+    @staticmethod
+    def paramDeclFromSpec(spec: dict) -> pya.PCellParameterDeclaration:
+        param_decl = pya.PCellParameterDeclaration(spec['name'], spec['type'], spec['description'], spec['default'])
+        for description, value in spec.get('choices', []):
+            param_decl.add_choice(description, value)
+        if 'min' in spec:
+            param_decl.min_value = spec['min']
+        if 'max' in spec:
+            param_decl.max_value = spec['max']
+        return param_decl
+
     def _printTraceBack(self):
         lines = traceback.format_exc().splitlines()
         firstLine = True
@@ -217,12 +473,82 @@ class PCellWrapper(pya.PCellDeclaration):
         return self.name() + " (...)"
 
     def produce(self, layout, layers, parameters, cell):
+        cacheKey = None
+        variantKey = None
+        if PCellWrapper.geometryCache.maxSize > 0 or PCellWrapper.variantStore is not None:
+            canonicalParams = PCellGeometryCache.canonicalParams(self.param_decls, parameters,
+                                                                 getattr(type(self._impl), 'numericParams', ()))
+            if PCellWrapper.geometryCache.maxSize > 0:
+                cacheKey = PCellWrapper.geometryCache.key(self, layout.dbu, canonicalParams)
+                if PCellWrapper.geometryCache.replay(cacheKey, cell):
+                    return
+            if PCellWrapper.variantStore is not None:
+                variantKey = PCellWrapper.variantStore.key(self.name(), layout.dbu, canonicalParams)
+                if PCellWrapper.variantStore.load(self.name(), variantKey, cell):
+                    if cacheKey is not None:
+                        PCellWrapper.geometryCache.capture(cacheKey, cell)
+                    return
+
         params = self.params_as_hash(parameters)
         try:
             with (PyCellContext(self.tech, cell, self._impl)):
                 self._impl.addCellContext(cell)
-                self._impl.setupParams(params)
-                self._impl.genLayout()
+                profiler = PCellProfiler.active
+                if profiler is None:
+                    self._impl.setupParams(params)
+                    self._impl.genLayout()
+                else:
+                    with profiler.sample(self.name(), params):
+                        with profiler.phase('setupParams'):
+                            self._impl.setupParams(params)
+                        with profiler.phase('genLayout'):
+                            self._impl.genLayout()
+                        profiler.countShapes(self._impl.getShapes())
         except Exception:
             self._printTraceBack()
+        else:
+            if cacheKey is not None:
+                PCellWrapper.geometryCache.capture(cacheKey, cell)
+            if variantKey is not None:
+                PCellWrapper.variantStore.save(self.name(), variantKey, cell)
 
+
+
+class LazyPCellWrapper(PCellWrapper):
+    """
+    PCellWrapper created from parameter specs as returned by PCellWrapper.paramSpecs.
+
+    The PyCell implementation isn't needed to declare the parameters, so it is only created by
+    calling 'loader' the first time a layout is produced. 'loader' returns the tuple
+    (impl, preProcPath, origPath).
+
+    """
+
+    def __init__(self, paramSpecs, tech, loader):
+        super(PCellWrapper, self).__init__()
+
+        self._impl = None
+        self._loader = loader
+        self._preProcPath = None
+        self._origPath = None
+
+        self.tech = tech
+
+        Tech.techInUse = tech.getTechParams()['libName']
+
+        self.param_decls = [PCellWrapper.paramDeclFromSpec(spec) for spec in paramSpecs]
+
+    def _load(self):
+        impl, self._preProcPath, self._origPath = self._loader()
+        impl.setTech(self.tech)
+        self._impl = impl
+        self._loader = None
+
+    def produce(self, layout, layers, parameters, cell):
+        if self._impl is None:
+            try:
+                self._load()
+            except Exception:
+                self._printTraceBack()
+                return
+        super().produce(layout, layers, parameters, cell)
@@ -31,6 +31,7 @@ class Dlo(object):
             self.terms = {}
             self.nets = {}
             self.shapes = []
+            self.groupings = []
 
 
     def __init__(self, libName, cellName, viewName='layout', viewType=None):
@@ -144,6 +145,10 @@ class Dlo(object):
         cellContext = self._getCurrentCellContext()
         cellContext.shapes.append(shape)
 
+    def addGrouping(self, grouping: Grouping) -> None:
+        cellContext = self._getCurrentCellContext()
+        cellContext.groupings.append(grouping)
+
     def addCellContext(self, cell):
         if cell in self._cellContexts:
             self._cellContexts.pop(cell)
@@ -155,6 +160,9 @@ class DloGen(Dlo):
 
     _libName = ''
 
+    # create regular arrays of rectangles (e.g. contacts) as CellInstArray, see createRectArray
+    rectArrays = False
+
     def __init__(self):
         super(DloGen, self).__init__('', '')
         self.tech = None
@@ -172,8 +180,93 @@ class DloGen(Dlo):
 
     def getShapes(self) -> list[Shape]:
         cellContext = self._getCurrentCellContext()
+        # creates the Polygons of the Groupings still holding a region (see Grouping.fromRegion)
+        [grouping.getComps() for grouping in cellContext.groupings]
+        cellContext.groupings.clear()
         return cellContext.shapes
 
+    def createRectArray(self, layer: Layer, boxes: list) -> bool:
+        """
+        Creates the rectangles 'boxes', given as (left, bottom, right, top) tuples, on the layer
+        'layer' as CellInstArrays of a cell holding one rectangle. This cell is shared by all arrays
+        with the same stream layer and rectangle size.
+
+        Snapping the rectangles to the grid makes the pitch of a row or column vary (e.g. 360, 365,
+        360, ...). Such a row or column is split into rows or columns of uniform pitch (see
+        _splitUniform), each resulting grid is created as one CellInstArray.
+
+        Returns False without creating anything if the rectangles, rounded to database units, don't
+        have the same size, don't form a complete grid or can't be created with fewer arrays than
+        rectangles.
+
+        """
+        if len(boxes) < 2:
+            return False
+
+        import cni.dlo
+        cell = cni.dlo.PyCellContext.getCurrentPyCellContext().cell
+        layout = cell.layout()
+
+        boxes = [pya.DBox(left, bottom, right, top).to_itype(layout.dbu) for left, bottom, right, top in boxes]
+        width = boxes[0].width()
+        height = boxes[0].height()
+        if any(box.width() != width or box.height() != height for box in boxes):
+            return False
+
+        origins = set((box.left, box.bottom) for box in boxes)
+        xs = sorted(set(x for x, _ in origins))
+        ys = sorted(set(y for _, y in origins))
+        if len(origins) != len(boxes) or len(xs) * len(ys) != len(origins):
+            return False
+
+        xRows = DloGen._splitUniform(xs)
+        yRows = DloGen._splitUniform(ys)
+        if len(xRows) * len(yRows) >= len(boxes):
+            return False
+
+        layerInfo = layout.get_info(layer.number)
+        rectCellName = f"RECT_{layerInfo.layer}_{layerInfo.datatype}_{width}x{height}"
+        rectCell = layout.cell(rectCellName)
+        if rectCell is None:
+            rectCell = layout.create_cell(rectCellName)
+            rectCell.shapes(layer.number).insert(pya.Box(0, 0, width, height))
+
+        for xRow in xRows:
+            dx = xRow[1] - xRow[0] if len(xRow) > 1 else 0
+            for yRow in yRows:
+                dy = yRow[1] - yRow[0] if len(yRow) > 1 else 0
+                cell.insert(pya.CellInstArray(rectCell.cell_index(), pya.Trans(xRow[0], yRow[0]),
+                                              pya.Vector(dx, 0), pya.Vector(0, dy), len(xRow), len(yRow)))
+
+        return True
+
+    @staticmethod
+    def _splitUniform(coordinates: list) -> list:
+        """
+        Splits the sorted 'coordinates' into lists of uniform pitch, either interleaved (for the
+        smallest period p for which coordinates[i+p]-coordinates[i] is the same for all i, the lists
+        coordinates[0::p], ..., coordinates[p-1::p]) or as consecutive runs, whichever gives fewer
+        lists.
+
+        """
+        count = len(coordinates)
+        interleaved = [[coordinate] for coordinate in coordinates]
+        for period in range(1, count):
+            pitch = coordinates[period] - coordinates[0]
+            if all(coordinates[index + period] - coordinates[index] == pitch for index in range(count - period)):
+                interleaved = [coordinates[offset::period] for offset in range(period)]
+                break
+
+        runs = []
+        for coordinate in coordinates:
+            run = runs[-1] if runs else None
+            if run is not None and (len(run) == 1 or coordinate - run[-1] == run[1] - run[0]):
+                run.append(coordinate)
+            else:
+                runs.append([coordinate])
+
+        return interleaved if len(interleaved) <= len(runs) else runs
+
     def addPin(self, pinName : str, termName: str, box : Box, layer: Layer) -> Pin:
         pin = Pin(pinName, termName)
 
@@ -18,11 +18,9 @@
 
 from __future__ import annotations
 from cni.grouping import *
-from cni.pointlist import PointList
-from cni.point import Point
-from cni.polygon import Polygon
 from cni.dlo import Tech
 from cni.shapefilter import ShapeFilter
+from cni.profiler import PCellProfiler
 
 import pya
 
@@ -114,6 +112,100 @@ def fgNot(components1: ulist[PhysicalComponent], components2: ulist[PhysicalComp
     return __fgOperation(components1, components2, resultLayer, 'fgNot')
 
 
+def fgOrList(components: ulist[PhysicalComponent], resultLayer: Layer) -> Grouping:
+    """
+    Performs a logical OR operation for all physical components in the list components, by merging
+    the polygon areas of all of them at once. The resulting merged polygon shapes are generated on
+    the resultLayer layer. In addition, these polygon shapes are used to create a Grouping object,
+    which is the return value for this method.
+
+    :param components: list of physical component derived objects
+    :type components: list of PhysicalCompent
+    :param resultLayer: layer where resulting shapes will be generated on
+    :type resultLayer: Layer
+    :return: grouping object
+    :rtype: Grouping
+
+    """
+
+    return __fgListOperation(components, resultLayer, 'fgOrList')
+
+
+def fgAndList(components: ulist[PhysicalComponent], resultLayer: Layer) -> Grouping:
+    """
+    Performs a logical AND operation for all physical components in the list components, by
+    selecting those polygon areas which are in every physical component. The resulting polygon
+    shapes are generated on the resultLayer layer. In addition, these polygon shapes are used to
+    create a Grouping object, which is the return value for this method. If there are no polygon
+    shapes, then this Grouping object is empty.
+
+    :param components: list of physical component derived objects
+    :type components: list of PhysicalCompent
+    :param resultLayer: layer where resulting shapes will be generated on
+    :type resultLayer: Layer
+    :return: grouping object
+    :rtype: Grouping
+
+    """
+
+    return __fgListOperation(components, resultLayer, 'fgAndList')
+
+
+def fgXorList(components: ulist[PhysicalComponent], resultLayer: Layer) -> Grouping:
+    """
+    Performs a logical XOR operation for all physical components in the list components, by
+    selecting those polygon areas which are in an odd number of physical components. The resulting
+    merged polygon shapes are generated on the resultLayer layer. In addition, these polygon shapes
+    are used to create a Grouping object, which is the return value for this method.
+
+    :param components: list of physical component derived objects
+    :type components: list of PhysicalCompent
+    :param resultLayer: layer where resulting shapes will be generated on
+    :type resultLayer: Layer
+    :return: grouping object
+    :rtype: Grouping
+
+    """
+
+    return __fgListOperation(components, resultLayer, 'fgXorList')
+
+
+def __fgListOperation(
+        components: ulist[PhysicalComponent],
+        resultLayer: Layer,
+        operation: str,
+        filter: ShapeFilter = ShapeFilter()) -> Grouping:
+    PCellProfiler.countOperation(operation)
+
+    if operation == 'fgOrList':
+        region = pya.Region()
+        [component.addToRegion(region, filter) for component in components]
+        region.merge()
+        return Grouping.fromRegion(region, resultLayer)
+
+    region = None
+
+    for component in components:
+        operand = pya.Region()
+        component.addToRegion(operand, filter)
+
+        if region is None:
+            region = operand
+        elif operation == 'fgAndList':
+            region = region.and_(operand)
+        elif operation == 'fgXorList':
+            region = region.xor(operand)
+        else:
+            raise Exception(f"Operation '{operation}' not supported")
+
+    if region is None:
+        region = pya.Region()
+    elif len(components) == 1:
+        region.merge()
+
+    return Grouping.fromRegion(region, resultLayer)
+
+
 def __fgOperation(
         components1: ulist[PhysicalComponent],
         components2: ulist[PhysicalComponent],
@@ -121,6 +213,8 @@ def __fgOperation(
         operation: str,
         filter1: ShapeFilter = ShapeFilter(),
         filter2: ShapeFilter = ShapeFilter()) -> Grouping:
+    PCellProfiler.countOperation(operation)
+
     region1 = pya.Region()
     region2 = pya.Region()
 
@@ -138,17 +232,7 @@ def __fgOperation(
     else:
         raise Exception(f"Operation '{operation}' not supported")
 
-    grouping = Grouping()
-
-    for poly in region.each():
-        pointList = PointList()
-        for point in poly.to_simple_polygon().to_dtype(Tech.get(Tech.techInUse).dataBaseUnits).each_point():
-            pointList.append(Point(point.x, point.y))
-
-        polygon = Polygon(resultLayer, pointList)
-        grouping.add(polygon)
-
-    return grouping
+    return Grouping.fromRegion(region, resultLayer)
 
 
 def fgSize(components: ulist[PhysicalComponent], filter: ShapeFilter, sizeValue: float, resultLayer: Layer, grid: float = None) -> Grouping:
@@ -178,25 +262,17 @@ def fgSize(components: ulist[PhysicalComponent], filter: ShapeFilter, sizeValue:
 
     """
 
+    PCellProfiler.countOperation('fgSize')
+
     region = pya.Region()
 
     [component.addToRegion(region, filter) for component in components]
 
-    grouping = Grouping()
-
     sizedRegion = region.sized(sizeValue / Tech.get(Tech.techInUse).dataBaseUnits)
 
     if grid is not None:
         decimalGrid = int(grid / Tech.get(Tech.techInUse).dataBaseUnits)
         sizedRegion.snap(decimalGrid, decimalGrid)
 
-    for poly in sizedRegion.each():
-        pointList = PointList()
-        for point in poly.to_simple_polygon().to_dtype(Tech.get(Tech.techInUse).dataBaseUnits).each_point():
-            pointList.append(Point(point.x, point.y))
-
-        polygon = Polygon(resultLayer, pointList)
-        grouping.add(polygon)
-
-    return grouping
+    return Grouping.fromRegion(sizedRegion, resultLayer)
 
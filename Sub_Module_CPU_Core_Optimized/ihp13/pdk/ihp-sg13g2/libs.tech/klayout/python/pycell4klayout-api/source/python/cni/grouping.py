@@ -20,61 +20,184 @@ from __future__ import annotations
 from cni.physicalComponent import *
 from cni.dlo import Tech
 from cni.dlo import Box
+from cni.polygon import Polygon
 
 import pya
 import sys
 
 class Grouping(PhysicalComponent):
+    """
+    Group of physical components.
+
+    A Grouping created by fromRegion (the result of the cni.geo operations) holds its polygons as
+    pya.Region in database units. The region is inserted into the cell as a whole, the Polygon
+    objects are only created when the components of the Grouping are accessed. Moving or
+    transforming the Grouping transforms the region as a whole. Using the Grouping as operand of
+    another operation or querying its bounding box works on the region directly.
+
+    The bounding boxes are cached per shape filter. The cache is extended when components are added
+    and invalidated when a component changes (see PhysicalComponent._invalidateBBox).
+
+    """
 
     def __init__(self, name: str = "", components: PhysicalComponent = None):
         super().__init__()
         self._name = name
         self._components = []
+        self._region = None
+        self._regionLayer = None
+        # bounding boxes in database units, by shape filter
+        self._bboxes = {}
 
         if components is not None:
-            self._components.add(components)
+            self.add(components)
+
+    @classmethod
+    def fromRegion(cls, region: pya.Region, layer: Layer) -> Grouping:
+        """
+        Returns a Grouping of the polygons of 'region' (in database units) on the layer 'layer'.
+
+        """
+        grouping = cls()
+        grouping._region = region
+        grouping._regionLayer = layer
+
+        import cni.dlo
+        if cni.dlo.PyCellContext.bufferedEmission:
+            pyCellContext = cni.dlo.PyCellContext.getCurrentPyCellContext()
+            pyCellContext.emitRegion(grouping, layer.number, region)
+            pyCellContext.impl.addGrouping(grouping)
+        else:
+            grouping._materialize()
+
+        return grouping
+
+    def _materialize(self) -> None:
+        """
+        Replaces the region of this Grouping by Polygon objects.
+
+        """
+        if self._region is None:
+            return
+
+        region = self._region
+        layer = self._regionLayer
+        self._region = None
+        self._regionLayer = None
+
+        import cni.dlo
+        cni.dlo.PyCellContext.takePendingShape(self)
+
+        dbu = Tech.get(Tech.techInUse).dataBaseUnits
+        for poly in region.each():
+            polygon = Polygon(poly.to_simple_polygon().to_dtype(dbu), 0, layer)
+            polygon._addParentGrouping(self)
+            self._components.append(polygon)
 
     def __iter__(self):
+        self._materialize()
         return self._components.__iter__()
 
     def __next__(self):
         return self._components.__next__()
 
     def add(self, components: PhysicalComponent) -> None:
+        self._materialize()
         if type(components) is not list:
-            self._components.append(components)
-        else:
-            self._components.extend(components)
+            components = [components]
+
+        for component in components:
+            component._addParentGrouping(self)
+            self._components.append(component)
+
+        for filter, bbox in self._bboxes.items():
+            region = pya.Region()
+            [component.addToRegion(region, filter) for component in components]
+            self._bboxes[filter] = bbox + region.bbox()
+        PhysicalComponent._invalidateBBox(self)
+
+    def _invalidateBBox(self) -> None:
+        self._bboxes.clear()
+        super()._invalidateBBox()
 
     def addToRegion(self, region: pya.Region, filter: ShapeFilter):
+        if self._region is not None and filter.isIncluded(self._regionLayer):
+            region.insert(self._region)
         [component.addToRegion(region, filter) for component in self._components]
 
     def clone(self, nameMap : NameMapper = NameMapper(), netMap : NameMapper = NameMapper()):
+        import cni.dlo
+        if self._region is not None and cni.dlo.PyCellContext.findPendingShape(self) is not None:
+            grouping = Grouping.fromRegion(self._region.dup(), self._regionLayer)
+            grouping._name = self._name
+            return grouping
+
+        self._materialize()
         components = []
         [components.append(component.clone()) for component in self._components]
         return Grouping(self._name, components)
 
     def destroy(self):
+        if self._region is not None:
+            import cni.dlo
+            cni.dlo.PyCellContext.takePendingShape(self)
+            self._region = None
+            self._regionLayer = None
         [component.destroy() for component in self._components]
         self._components.clear()
+        self._invalidateBBox()
 
     def getBBox(self, filter: ShapeFilter = ShapeFilter()) -> Box:
+        cacheable = type(filter) is ShapeFilter
+        if cacheable:
+            cached = self._bboxes.get(filter)
+            if cached is not None:
+                dbox = cached.to_dtype(Tech.get(Tech.techInUse).dataBaseUnits)
+                return Box(dbox.left, dbox.bottom, dbox.right, dbox.top)
+
         region = pya.Region()
-        [component.addToRegion(region, filter) for component in self._components]
-        dbox = region.bbox().to_dtype(Tech.get(Tech.techInUse).dataBaseUnits)
+        self.addToRegion(region, filter)
+        bbox = region.bbox()
+        if cacheable:
+            self._bboxes[filter] = bbox
+
+        dbox = bbox.to_dtype(Tech.get(Tech.techInUse).dataBaseUnits)
         return Box(dbox.left, dbox.bottom, dbox.right, dbox.top)
 
     def getComps(self) -> list:
+        self._materialize()
         return self._components
 
     def getComp(self, index: int) -> PhysicalComponent:
+        self._materialize()
         return self._components[index]
 
     def moveBy(self, dx: float, dy: float) -> None:
+        if self._transformRegion(pya.DCplxTrans(1.0, 0.0, False, float(dx), float(dy))):
+            return
+        self._materialize()
         [component.moveBy(dx, dy) for component in self._components]
 
     def toString(self):
+        self._materialize()
         [component.toString() for component in self._components]
 
     def transform(self, transform: Transform) -> None:
+        if self._transformRegion(transform.transform):
+            return
+        self._materialize()
         [component.transform(transform) for component in self._components]
+
+    def _transformRegion(self, transform: pya.DCplxTrans) -> bool:
+        """
+        Transforms the pending region of this Grouping in place, as a whole. Returns False if the
+        Grouping holds no pending region.
+
+        """
+        import cni.dlo
+        if self._region is None or cni.dlo.PyCellContext.findPendingShape(self) is None:
+            return False
+
+        self._region.transform(pya.ICplxTrans(transform, Tech.get(Tech.techInUse).dataBaseUnits))
+        self._invalidateBBox()
+        return True
@@ -17,18 +17,52 @@
 ########################################################################
 
 class Layer(object):
+    """
+    Layer of the layout of the current PyCellContext, given by name and purpose.
+
+    Layers are interned: constructing a Layer with the same name and purpose again returns the
+    same object, its layer index being resolved only once. The table of interned layers is
+    cleared whenever the layout or the technology of the current PyCellContext changes.
+
+    """
 
     tech = None
     layout = None
 
-    def __init__(self, name, purpose = None):
-        namePurpose = name if purpose is None else name + "." + purpose
+    # interned layers keyed by (name, purpose), valid for _internedLayout and _internedTech
+    _internedLayers = {}
+    _internedLayout = None
+    _internedTech = None
+
+    def __new__(cls, name, purpose = None):
         import cni.dlo
-        layer, datatype = cni.dlo.PyCellContext.getCurrentPyCellContext().tech.stream_layers()[namePurpose]
+        pyCellContext = cni.dlo.PyCellContext.getCurrentPyCellContext()
+        layout = pyCellContext.layout
+        tech = pyCellContext.tech
+
+        if layout is not Layer._internedLayout or tech is not Layer._internedTech:
+            Layer._internedLayers = {}
+            Layer._internedLayout = layout
+            Layer._internedTech = tech
+
+        layerObj = Layer._internedLayers.get((name, purpose))
+        if layerObj is None:
+            namePurpose = name if purpose is None else name + "." + purpose
+            layer, datatype = tech.stream_layers()[namePurpose]
+
+            layerObj = super().__new__(cls)
+            layerObj._name = namePurpose
+            layerObj._number = layout.layer(layer, datatype, namePurpose)
+            layerObj._purposeName = "" if purpose is None else purpose
+            Layer._internedLayers[(name, purpose)] = layerObj
+
+        return layerObj
+
+    def __copy__(self):
+        return self
 
-        self._name = namePurpose
-        self._number = cni.dlo.PyCellContext.getCurrentPyCellContext().layout.layer(layer, datatype, namePurpose)
-        self._purposeName = "" if purpose is None else purpose
+    def __deepcopy__(self, memo):
+        return self
 
     def getAttrs(self):
         raise Exception("Not implemented yet!")
@@ -24,7 +24,6 @@ from cni.pathstyle import *
 from cni.tech import Tech
 
 import pya
-import copy
 
 class Path(Shape):
     """
@@ -42,6 +41,8 @@ class Path(Shape):
 
     """
 
+    __slots__ = ('_path',)
+
     @singledispatchmethod
     def __init__(self, arg1, arg2, arg3, arg4 = None):
         pass
@@ -61,43 +62,37 @@ class Path(Shape):
 
     def __internalInit(self, layer: Layer):
         super().__init__(layer, self._path.bbox())
-        self.set_shape(Shape.getCell().shapes(layer.number).insert(self._path))
+        self._insertShape(layer.number, self._path)
 
     def addToRegion(self, region: pya.Region, filter: ShapeFilter):
-        if filter.isIncluded(self._shape.layer):
+        if filter.isIncluded(self._getShapeLayer()):
             region.insert(self._path.to_itype(Tech.get(Tech.techInUse).dataBaseUnits))
 
     def clone(self, nameMap : NameMapper = NameMapper(), netMap : NameMapper = NameMapper()):
-        path = copy.deepcopy(self)
-        path.__internalInit(path.getLayer())
+        path = Path.__new__(Path)
+        path._path = self._path.dup()
+        path.__internalInit(self._layer)
+        self._cloneAttributes(path)
         return path
 
     def destroy(self):
         if not self._path._destroyed():
-            Shape.getCell().shapes(self.getShape().layer).erase(self.getShape())
+            self._eraseShape()
             self._path._destroy()
         else:
             pya.Logger.warn(f"Path.destroy: already destroyed!")
 
     def getPoints(self) -> PointList:
-        pointList = PointList()
-        [pointList.append(Point(point.x, point.y)) for point in self._path.each_point()]
-        return pointList
+        return PointList.fromPolygon(self._path)
 
     def moveBy(self, dx: float, dy: float) -> None:
-        movedPath = (pya.DTrans(float(dx), float(dy)) * self._path)
-        shape = Shape.getCell().shapes(self._shape.layer).insert(movedPath)
-        self.destroy()
-        self._path = movedPath
-        self.set_shape(shape)
+        self._path = pya.DTrans(float(dx), float(dy)) * self._path
+        self._replaceShape(self._path)
 
     def toString(self) -> str:
         return "Path: {}".format(self._path.to_s())
 
     def transform(self, transform: Transform) -> None:
-        transformedPath = self._path.transformed(transform.transform)
-        shape = Shape.getCell().shapes(self.getShape().layer).insert(transformedPath)
-        self.destroy()
-        self._path = transformedPath
-        self.set_shape(shape)
+        self._path = self._path.transformed(transform.transform)
+        self._replaceShape(self._path)
 
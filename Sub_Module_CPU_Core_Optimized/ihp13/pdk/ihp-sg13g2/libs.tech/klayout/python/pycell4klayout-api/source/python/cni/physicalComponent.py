@@ -24,15 +24,20 @@ from cni.transform import Transform
 from cni.shapefilter import ShapeFilter
 
 import pya
-import re
+import weakref
 
 class PhysicalComponent(ABC):
 
+    __slots__ = ('__weakref__',)
+
+    # Groupings containing a component, whose cached bounding boxes depend on it
+    _parentGroupings = weakref.WeakKeyDictionary()
+
     def __getattr__(self, name):
-        if re.fullmatch(r'__(\S*)__', name):
-            return super.__getattr__(name)
-        else:
-            return False
+        # attributes never set (e.g. flags like 'col' set on some shapes only) read as False
+        if name[:2] == '__' and name[-2:] == '__':
+            raise AttributeError(name)
+        return False
 
     @abstractmethod
     def addToRegion(self, region: pya.Region):
@@ -46,6 +51,22 @@ class PhysicalComponent(ABC):
     def getBBox(self, filter: ShapeFilter = ShapeFilter()) -> Box:
         pass
 
+    def _addParentGrouping(self, grouping: Grouping) -> None:
+        parents = PhysicalComponent._parentGroupings.get(self)
+        if parents is None:
+            parents = weakref.WeakSet()
+            PhysicalComponent._parentGroupings[self] = parents
+        parents.add(grouping)
+
+    def _invalidateBBox(self) -> None:
+        """
+        Invalidates the cached bounding boxes depending on the geometry of this component.
+
+        """
+        parents = PhysicalComponent._parentGroupings.get(self)
+        if parents is not None:
+            [parent._invalidateBBox() for parent in list(parents)]
+
     def fgOr(self, component: PhysicalComponent, resultLayer: Layer) -> Grouping:
         """
         Performs a logical or operation for this physical component and another physical component,
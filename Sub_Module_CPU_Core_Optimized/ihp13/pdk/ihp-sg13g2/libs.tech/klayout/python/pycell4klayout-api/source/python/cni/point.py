@@ -21,6 +21,9 @@ import pya
 import math
 
 class Point(object):
+
+    __slots__ = ('point',)
+
     def __init__(self, x, y):
         self.point = pya.DPoint(x, y)
 
@@ -21,11 +21,80 @@ from __future__ import annotations
 from cni.point import *
 from cni.ulist import *
 
+# point lists shorter than this are handled in plain Python, as NumPy doesn't pay off for them
+POINTLIST_NUMPY_MIN_COUNT = 32
+
+# precision of the coordinate comparison of pya.DPoint (used by Point.__eq__)
+POINTLIST_EPSILON = 1e-5
+
+# NumPy module once imported, None if it isn't installed (see _importNumpy)
+_numpy = False
+
+def _importNumpy():
+    # importing NumPy takes longer than loading the whole library, so it is imported on the
+    # first point list long enough to benefit from it instead of on loading this module
+    global _numpy
+
+    if _numpy is False:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+
+    return _numpy
+
 class PointList(ulist[Point]):
+    """
+    List of Point objects.
+
+    The geometry queries (containsPoint, containsPoints, compress) work on the coordinates as
+    a Nx2 array (see toArray) if NumPy is installed and the list is long enough, otherwise in
+    plain Python. Both give the same results. fromPolygon and toPolygon convert from and to
+    pya.DSimplePolygon directly.
+
+    """
 
     def __init__(self, items = None) -> None:
         super().__init__(items)
 
+    @classmethod
+    def fromPolygon(cls, polygon) -> PointList:
+        """
+        Returns the points of the pya.DSimplePolygon (or pya.DPath) polygon as PointList.
+
+        :param polygon: polygon
+        :type polygon: pya.DSimplePolygon
+        :return: points of the polygon
+        :rtype: PointList
+        """
+
+        return cls([Point(point.x, point.y) for point in polygon.each_point()])
+
+    def toPolygon(self) -> pya.DSimplePolygon:
+        """
+        Returns a pya.DSimplePolygon with the points of this PointList, taken as they are.
+
+        :return: polygon
+        :rtype: pya.DSimplePolygon
+        """
+
+        return pya.DSimplePolygon([point.point for point in self], True)
+
+    def toArray(self):
+        """
+        Returns the coordinates of this PointList as Nx2 NumPy array. Requires NumPy.
+
+        :return: x and y coordinates of the points
+        :rtype: numpy.ndarray
+        """
+
+        numpy = _importNumpy()
+        if numpy is None:
+            raise Exception("PointList.toArray requires NumPy")
+
+        return numpy.array([(point.point.x, point.point.y) for point in self], dtype=numpy.float64).reshape(-1, 2)
+
     def compress(self, isClose = True) -> PointList:
         """
         Compresses this PointList, by removing any extra (coincident and/or collinear) points from
@@ -49,6 +118,9 @@ class PointList(ulist[Point]):
             self = firstPointList
             return self
 
+        if len(self) >= POINTLIST_NUMPY_MIN_COUNT and _importNumpy() is not None:
+            return self.__compressArray()
+
         pairUniqueList = []
         [pairUniqueList.append(value) for index, value in enumerate(self) if index == 0 or value != self[index-1]]
 
@@ -63,6 +135,24 @@ class PointList(ulist[Point]):
         self = nonColinearList
         return self
 
+    def __compressArray(self) -> list:
+        # same as the loops in compress: drops the points coincident with their predecessor, then
+        # the points collinear with their remaining neighbours (see Point.areColinearPoints)
+        numpy = _importNumpy()
+        coords = self.toArray()
+
+        isUnique = numpy.ones(len(coords), dtype=bool)
+        isUnique[1:] = numpy.any(numpy.abs(coords[1:] - coords[:-1]) >= POINTLIST_EPSILON, axis=1)
+        indices = numpy.flatnonzero(isUnique)
+
+        x = coords[indices, 0]
+        y = coords[indices, 1]
+        isKept = numpy.ones(len(indices), dtype=bool)
+        isKept[1:-1] = 0.5 * numpy.abs((x[:-2] * (y[1:-1] - y[2:])) + (x[1:-1] * (y[2:] - y[:-2])) +
+                                       (x[2:] * (y[:-2] - y[1:-1]))) != 0.0
+
+        return [self[index] for index in indices[isKept].tolist()]
+
     def containsPoint(self, point: Point) -> bool:
         # Jordan point in polygon test
         numVertices = len(self)
@@ -85,3 +175,35 @@ class PointList(ulist[Point]):
             p1 = p2
 
         return isInside
+
+    def containsPoints(self, points: list[Point]) -> list[bool]:
+        """
+        Returns for each of the points whether it is inside the polygon given by this PointList, as
+        containsPoint does. With NumPy, all points are tested against all edges at once.
+
+        :param points: points to test
+        :type points: list of Point
+        :return: whether the points are inside
+        :rtype: list of bool
+        """
+
+        if len(points) * len(self) < POINTLIST_NUMPY_MIN_COUNT or _importNumpy() is None:
+            return [self.containsPoint(point) for point in points]
+
+        numpy = _importNumpy()
+
+        # edges (p1, p2) as rows, points as columns, the same arithmetic as containsPoint
+        coords = self.toArray()
+        x1 = coords[:, 0:1]
+        y1 = coords[:, 1:2]
+        x2 = numpy.roll(x1, -1, axis=0)
+        y2 = numpy.roll(y1, -1, axis=0)
+        x = numpy.array([point.x for point in points], dtype=numpy.float64)
+        y = numpy.array([point.y for point in points], dtype=numpy.float64)
+
+        isCrossing = (y > numpy.minimum(y1, y2)) & (y <= numpy.maximum(y1, y2)) & (x <= numpy.maximum(x1, x2))
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            x_intersection = (y - y1) * (x2 - x1) / (y2 - y1) + x1
+        isCrossing &= (x1 == x2) | (x <= x_intersection)
+
+        return (numpy.count_nonzero(isCrossing, axis=0) % 2 == 1).tolist()
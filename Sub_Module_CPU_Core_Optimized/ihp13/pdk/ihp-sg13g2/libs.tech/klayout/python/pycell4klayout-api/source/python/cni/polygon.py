@@ -23,20 +23,18 @@ from cni.pointlist import *
 from cni.tech import Tech
 
 import pya
-import copy
 
 class Polygon(Shape):
 
+    __slots__ = ('_polygon',)
+
     @singledispatchmethod
     def __init__(self, arg1, arg2, arg3 = None):
         pass
 
     @__init__.register
     def _(self, arg1: Layer, arg2: PointList) -> None:
-        pyaPoints = []
-        [pyaPoints.append(point.point) for point in arg2]
-
-        self._polygon = pya.DSimplePolygon(pyaPoints, True)
+        self._polygon = pya.DSimplePolygon([point.point for point in arg2], True)
         self.__internalInit(arg1)
 
     @__init__.register
@@ -46,44 +44,38 @@ class Polygon(Shape):
 
     def __internalInit(self, layer: Layer):
         super().__init__(layer, self._polygon.bbox())
-        self.set_shape(Shape.getCell().shapes(layer.number).insert(self._polygon))
+        self._insertShape(layer.number, self._polygon)
 
     def addToRegion(self, region: pya.Region, filter: ShapeFilter):
-        if filter.isIncluded(self._shape.layer):
+        if filter.isIncluded(self._getShapeLayer()):
             region.insert(self._polygon.to_itype(Tech.get(Tech.techInUse).dataBaseUnits))
 
     def clone(self, nameMap : NameMapper = NameMapper(), netMap : NameMapper = NameMapper()):
-        poly = copy.deepcopy(self)
-        poly.__internalInit(poly.getLayer())
+        poly = Polygon.__new__(Polygon)
+        poly._polygon = self._polygon.dup()
+        poly.__internalInit(self._layer)
+        self._cloneAttributes(poly)
         return poly
 
     def destroy(self):
         if not self._polygon._destroyed():
-            Shape.getCell().shapes(self.getShape().layer).erase(self.getShape())
+            self._eraseShape()
             self._polygon._destroy()
         else:
             pya.Logger.warn(f"Polygon.destroy: already destroyed!")
 
     def getPoints(self) -> PointList:
-        pointList = PointList()
-        [pointList.append(Point(point.x, point.y)) for point in self._polygon.each_point()]
-        return pointList
+        return PointList.fromPolygon(self._polygon)
 
     def moveBy(self, dx: float, dy: float) -> None:
-        movedPolygon = (pya.DTrans(float(dx), float(dy)) * self._polygon).to_itype(Tech.get(Tech.techInUse).
-            dataBaseUnits).to_simple_polygon().to_dtype(Tech.get(Tech.techInUse).dataBaseUnits)
-        shape = Shape.getCell().shapes(self._shape.layer).insert(movedPolygon)
-        self.destroy()
-        self._polygon = movedPolygon
-        self.set_shape(shape)
+        dbu = Tech.get(Tech.techInUse).dataBaseUnits
+        self._polygon = (pya.DTrans(float(dx), float(dy)) * self._polygon).to_itype(dbu).to_dtype(dbu)
+        self._replaceShape(self._polygon)
 
     def toString(self) -> str:
         return "Polygon: {}".format(self._polygon.to_s())
 
     def transform(self, transform: Transform) -> None:
-        transformedPolygon = self._polygon.transformed(transform.transform)
-        shape = Shape.getCell().shapes(self.getShape().layer).insert(transformedPolygon)
-        self.destroy()
-        self._polygon = transformedPolygon
-        self.set_shape(shape)
+        self._polygon = self._polygon.transformed(transform.transform)
+        self._replaceShape(self._polygon)
 
@@ -0,0 +1,181 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the GNU General Public License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+from __future__ import annotations
+from cni.numeric import Numeric
+
+import csv
+import json
+import time
+import atexit
+import contextlib
+import tracemalloc
+
+
+class PCellProfiler(object):
+    """
+    Profiler of the layouts generated by the PCellWrappers.
+
+    For every generated layout the wall time of 'setupParams' and 'genLayout', the number of shapes
+    created per layer, the geometric operations run via cni.geo and the peak of the memory allocated
+    (via tracemalloc) are recorded. The samples are aggregated by PCell name and parameter bucket,
+    the numeric parameter values being rounded to two significant digits.
+
+    The results are written to 'path' at process exit, as JSON if 'path' ends with '.json',
+    otherwise as CSV. Layouts replayed from a cache aren't generated and thus not profiled.
+
+    The profiler is enabled by assigning it to PCellProfiler.active.
+
+    """
+
+    # enabled profiler, None if profiling is off
+    active = None
+
+    def __init__(self, path: str):
+        self._path = path
+        self._stats = {}
+        self._samples = []
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        atexit.register(self.write)
+
+    @staticmethod
+    def bucketValue(value):
+        if type(value) is bool or value is None:
+            return value
+        if type(value) is str:
+            try:
+                value = Numeric(value.strip())
+            except ValueError:
+                return value
+        return f"{float(value):.2g}"
+
+    @contextlib.contextmanager
+    def sample(self, pcellName: str, params: dict):
+        """
+        Returns a context manager recording the generation of one layout of 'pcellName'.
+
+        """
+        sample = {'times': {}, 'shapes': {}, 'operations': {}}
+        self._samples.append(sample)
+
+        # the tracing may have been stopped by someone else since (e.g. StartupTrace.write)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        startMemory, _ = tracemalloc.get_traced_memory()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+        try:
+            yield
+        finally:
+            _, peakMemory = tracemalloc.get_traced_memory()
+            self._samples.pop()
+
+            bucket = tuple((name, PCellProfiler.bucketValue(value)) for name, value in params.items())
+            stats = self._stats.setdefault((pcellName, bucket), {
+                'count': 0, 'times': {}, 'maxTimes': {}, 'shapes': {}, 'operations': {}, 'peakBytes': 0
+            })
+
+            stats['count'] += 1
+            for phase, duration in sample['times'].items():
+                stats['times'][phase] = stats['times'].get(phase, 0.0) + duration
+                stats['maxTimes'][phase] = max(stats['maxTimes'].get(phase, 0.0), duration)
+            for layerName, count in sample['shapes'].items():
+                stats['shapes'][layerName] = stats['shapes'].get(layerName, 0) + count
+            for operation, count in sample['operations'].items():
+                stats['operations'][operation] = stats['operations'].get(operation, 0) + count
+            stats['peakBytes'] = max(stats['peakBytes'], peakMemory - startMemory)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        Returns a context manager recording the wall time of the phase 'name' of the current sample.
+
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            times = self._samples[-1]['times']
+            times[name] = times.get(name, 0.0) + time.perf_counter() - start
+
+    def countShapes(self, shapes: list):
+        counts = self._samples[-1]['shapes']
+        for shape in shapes:
+            layerName = shape.getLayer().getLayerName()
+            counts[layerName] = counts.get(layerName, 0) + 1
+
+    @classmethod
+    def countOperation(cls, operation: str):
+        """
+        Counts the geometric operation 'operation' for the current sample, if profiling is on.
+
+        """
+        if cls.active is None or len(cls.active._samples) == 0:
+            return
+        operations = cls.active._samples[-1]['operations']
+        operations[operation] = operations.get(operation, 0) + 1
+
+    def results(self) -> list:
+        results = []
+        for (pcellName, bucket), stats in sorted(self._stats.items(), key=lambda item: -sum(item[1]['times'].values())):
+            results.append({
+                'pcell': pcellName,
+                'params': {name: value for name, value in bucket},
+                'count': stats['count'],
+                'setupParams_s': stats['times'].get('setupParams', 0.0),
+                'genLayout_s': stats['times'].get('genLayout', 0.0),
+                'genLayout_max_s': stats['maxTimes'].get('genLayout', 0.0),
+                'peak_bytes': stats['peakBytes'],
+                'shapes': stats['shapes'],
+                'operations': stats['operations']
+            })
+        return results
+
+    def write(self):
+        """
+        Writes the aggregated results, sorted by descending total time.
+
+        """
+        results = self.results()
+
+        if self._path.endswith('.json'):
+            with open(self._path, 'w') as profileFile:
+                json.dump(results, profileFile, indent=1)
+            return
+
+        with open(self._path, 'w', newline='') as profileFile:
+            writer = csv.writer(profileFile)
+            writer.writerow(['pcell', 'params', 'count', 'setupParams_s', 'genLayout_s', 'genLayout_max_s',
+                             'peak_bytes', 'shapes', 'operations'])
+            for result in results:
+                writer.writerow([
+                    result['pcell'],
+                    ' '.join(f"{name}={value}" for name, value in result['params'].items()),
+                    result['count'],
+                    f"{result['setupParams_s']:.6f}",
+                    f"{result['genLayout_s']:.6f}",
+                    f"{result['genLayout_max_s']:.6f}",
+                    result['peak_bytes'],
+                    ' '.join(f"{name}:{count}" for name, count in sorted(result['shapes'].items())),
+                    ' '.join(f"{name}:{count}" for name, count in sorted(result['operations'].items()))
+                ])
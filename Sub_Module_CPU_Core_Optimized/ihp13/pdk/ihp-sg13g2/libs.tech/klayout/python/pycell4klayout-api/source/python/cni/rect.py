@@ -21,10 +21,10 @@ from cni.box import Box
 from cni.layer import Layer
 from cni.tech import Tech
 
-import copy
-
 class Rect(Shape):
 
+    __slots__ = ('_box',)
+
     def __init__(self, layer: Layer, box: Box):
         self._box = box
         self._layer = layer
@@ -32,7 +32,7 @@ class Rect(Shape):
 
     def __internalInit(self):
         super().__init__(self._layer, self._box)
-        self.set_shape(Shape.getCell().shapes(self._layer.number).insert(self._box.box))
+        self._insertShape(self._layer.number, self._box.box)
         self._box.setRect(self)
 
     def addToRegion(self, region: pya.Region, filter: ShapeFilter):
@@ -40,8 +40,9 @@ class Rect(Shape):
             region.insert(self._box.box.to_itype(Tech.get(Tech.techInUse).dataBaseUnits))
 
     def clone(self, nameMap : NameMapper = NameMapper(), netMap : NameMapper = NameMapper()):
-        rect = copy.deepcopy(self)
-        rect.__internalInit()
+        box = self._box.box
+        rect = Rect(self._layer, Box(box.left, box.bottom, box.right, box.top))
+        self._cloneAttributes(rect)
         return rect
 
     def destroy(self):
@@ -27,6 +27,9 @@ import pya
 
 class Shape(PhysicalComponent):
 
+    # '__dict__' holds the attributes PyCells set on their shapes, it is only created when used
+    __slots__ = ('_shape', '_layer', '_bbox', '_net', '_pin', '__dict__')
+
     @classmethod
     def getCell(cls) -> pya.Cell:
         import cni.dlo
@@ -35,7 +38,8 @@ class Shape(PhysicalComponent):
     def __init__(self, layer: Layer, bbox: Box):
         self._shape = None
         self._layer = layer
-        self._bbox = bbox
+        # pya.DBox of the shape, updated on every (re)insertion (see _insertShape)
+        self._bbox = bbox.box if type(bbox) is Box else bbox
         self._net = None
         self._pin = None
 
@@ -51,22 +55,100 @@ class Shape(PhysicalComponent):
         self._shape = shape
 
     def getShape(self):
+        if self._shape is None:
+            import cni.dlo
+            cni.dlo.PyCellContext.insertPendingShape(self)
         if self._shape is None:
             raise Exception(f"Shape.getShape no shape set {hex(id(self))}: {hex(id(self._shape))}")
         return self._shape
 
+    def _insertShape(self, layer: int, shape) -> None:
+        """
+        Inserts 'shape' into the layer with index 'layer' of the current cell. In buffered emission
+        mode the insertion is deferred (see PyCellContext.emitShape).
+
+        """
+        self._bbox = shape if type(shape) is pya.DBox else shape.bbox()
+        self._invalidateBBox()
+
+        import cni.dlo
+        pyCellContext = cni.dlo.PyCellContext.getCurrentPyCellContext()
+        if cni.dlo.PyCellContext.bufferedEmission:
+            self._shape = None
+            pyCellContext.emitShape(self, layer, shape)
+        else:
+            self.set_shape(pyCellContext.cell.shapes(layer).insert(shape))
+
+    def _cloneAttributes(self, shape: Shape) -> None:
+        """
+        Copies the attributes PyCells have set on this Shape to its clone 'shape'.
+
+        """
+        if self.__dict__:
+            shape.__dict__.update(self.__dict__)
+
+    def _replaceShape(self, shape) -> None:
+        """
+        Replaces the geometry of this Shape by 'shape', which is of the same type as the one
+        inserted before, in place: a pending shape is updated, an inserted one is modified in the
+        cell.
+
+        """
+        self._bbox = shape if type(shape) is pya.DBox else shape.bbox()
+        self._invalidateBBox()
+
+        import cni.dlo
+        if self._shape is None and cni.dlo.PyCellContext.replacePendingShape(self, shape):
+            return
+
+        if type(shape) is pya.DBox:
+            self.getShape().dbox = shape
+        elif type(shape) is pya.DSimplePolygon:
+            self.getShape().dsimple_polygon = shape
+        elif type(shape) is pya.DPath:
+            self.getShape().dpath = shape
+        elif type(shape) is pya.DText:
+            self.getShape().dtext = shape
+        else:
+            raise Exception(f"Shape type '{type(shape).__name__}' not supported")
+
+    def _eraseShape(self) -> None:
+        self._invalidateBBox()
+
+        import cni.dlo
+        if self._shape is None and cni.dlo.PyCellContext.takePendingShape(self) is not None:
+            return
+        Shape.getCell().shapes(self.getShape().layer).erase(self.getShape())
+
+    def _getShapeLayer(self) -> int:
+        if self._shape is None:
+            import cni.dlo
+            pendingShape = cni.dlo.PyCellContext.findPendingShape(self)
+            if pendingShape is not None:
+                return pendingShape[0]
+        return self.getShape().layer
+
     def getBBox(self, filter: ShapeFilter = ShapeFilter()) -> Box:
         if type(filter) is Layer and self._layer.getLayerName() == filter.getLayerName():
-            return Box(self._bbox.box.left, self._bbox.box.bottom, self._bbox.box.right, self._bbox.box.top)
+            return Box(self._bbox.left, self._bbox.bottom, self._bbox.right, self._bbox.top)
 
         if filter.isIncluded(self._layer):
-            return Box(self._bbox.box.left, self._bbox.box.bottom, self._bbox.box.right, self._bbox.box.top)
+            return Box(self._bbox.left, self._bbox.bottom, self._bbox.right, self._bbox.top)
         else:
             return Box(INT_MAX, INT_MAX, INT_MIN, INT_MIN)
 
     def getLayer(self) -> Layer:
         return self._layer
 
+    def setLayer(self, layer: Layer) -> None:
+        """
+        Moves this Shape to the layer 'layer'.
+
+        """
+        self.getShape().layer = layer.number
+        self._layer = layer
+        self._invalidateBBox()
+
     def getNet(self) -> Net:
         return self._net
 
@@ -94,3 +176,11 @@ class Shape(PhysicalComponent):
 
         """
         return self.getLayer()
+
+    @layer.setter
+    def layer(self, value):
+        """
+        Moves this Shape to the layer 'value'
+
+        """
+        self.setLayer(value)
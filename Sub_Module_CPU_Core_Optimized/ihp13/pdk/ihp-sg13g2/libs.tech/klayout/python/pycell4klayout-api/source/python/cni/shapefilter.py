@@ -47,37 +47,49 @@ class ShapeFilter(object):
     :param shapeFilter: ShapeFilter to filter
     :type shapeFilter: ShapeFilter
 
+
+    ShapeFilter objects are immutable and hashable, two filters being equal if they consider the
+    same layers. The layers are held as set of layer indices, so checking a layer takes constant
+    time.
+
     """
 
     def __init__(self, arg = None):
-        self._layers = []
-
-        if arg is not None:
-            if type(arg) is Layer:
-                self._layers.append(arg)
-            elif type(arg) is list:
-                self._layers.extend(arg)
-            elif type(arg) is ShapeFilter:
-                self = arg.copy.deepcopy();
-            else:
-                raise Exception(f"Not supported type '{type(arg)}'")
+        if arg is None:
+            layers = ()
+        elif type(arg) is Layer:
+            layers = (arg,)
+        elif isinstance(arg, (list, tuple)):
+            layers = tuple(arg)
+        elif type(arg) is ShapeFilter:
+            layers = arg._layers
+        else:
+            raise Exception(f"Not supported type '{type(arg)}'")
+
+        self._layers = layers
+        self._layerNumbers = frozenset(layer.number for layer in layers)
+
+    def __eq__(self, other):
+        return type(other) is ShapeFilter and self._layerNumbers == other._layerNumbers
+
+    def __hash__(self):
+        return hash(self._layerNumbers)
 
     def isIncluded(self, layer: Layer) -> bool:
         """
         Returns true if the layer parameter is a layer which is in the list of layers considered by
         the ShapeFilter object, and returns False otherwise.
 
-        :param layer: Layer to check
+        :param layer: Layer or layer index to check
         :type layer: Layer
         :rtype: bool
 
         """
 
-        if len(self._layers) == 0:
+        if not self._layerNumbers:
             return True
 
-        for item in self._layers:
-            if layer.getLayerName() == item.getLayerName():
-                return True
+        if type(layer) is int:
+            return layer in self._layerNumbers
 
-        return False
+        return layer.number in self._layerNumbers
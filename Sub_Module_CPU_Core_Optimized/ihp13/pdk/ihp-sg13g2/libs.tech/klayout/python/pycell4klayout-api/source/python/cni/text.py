@@ -23,10 +23,11 @@ from cni.location import Location
 from cni.transform import Transform
 
 import pya
-import copy
 
 class Text(Shape):
 
+    __slots__ = ('_text', '_height')
+
     def __init__(self, layer: Layer, text: str, origin: Point, height: float):
         text = pya.DText(text, pya.DTrans(origin.getX(), origin.getY()), height, 2)
 
@@ -38,30 +39,31 @@ class Text(Shape):
 
     def __internalInit(self):
         super().__init__(self._layer, Box(self._text.bbox().left, self._text.bbox().bottom, self._text.bbox().right, self._text.bbox().top))
-        self.set_shape(Shape.getCell().shapes(self._layer.number).insert(self._text))
+        self._insertShape(self._layer.number, self._text)
 
     def addToRegion(self, region: pya.Region, filter: ShapeFilter):
-        if filter.isIncluded(self.getShape().layer):
+        if filter.isIncluded(self._getShapeLayer()):
             region.insert(self._text)
 
     def clone(self, nameMap : NameMapper = NameMapper(), netMap : NameMapper = NameMapper()):
-        text = copy.deepcopy(self)
+        text = Text.__new__(Text)
+        text._text = self._text.dup()
+        text._layer = self._layer
+        text._height = self._height
         text.__internalInit()
+        self._cloneAttributes(text)
         return text
 
     def destroy(self):
         if not self._text._destroyed():
-            Shape.getCell().shapes(self.getShape().layer).erase(self.getShape())
+            self._eraseShape()
             self._text._destroy()
         else:
             pya.Logger.warn(f"Text.destroy: already destroyed!")
 
     def moveBy(self, dx: float, dy: float) -> None:
-        movedText = (pya.DTrans(float(dx), float(dy)) * self._text)
-        shape = Shape.getCell().shapes(self._shape.layer).insert(movedText)
-        self.destroy()
-        self._text = movedText
-        self.set_shape(shape)
+        self._text = pya.DTrans(float(dx), float(dy)) * self._text
+        self._replaceShape(self._text)
 
     def setAlignment(self, location: Location) -> None:
         width = len(self._text.string) * self._height
@@ -95,10 +97,10 @@ class Text(Shape):
                 self._text.halign = pya.HAlign.HAlignRight
                 self._text.valign = pya.VAlign.VAlignTop
 
-        layer = self.getShape().layer
+        layer = self._getShapeLayer()
 
-        Shape.getCell().shapes(layer).erase(self.getShape())
-        self.set_shape(Shape.getCell().shapes(layer).insert(self._text))
+        self._eraseShape()
+        self._insertShape(layer, self._text)
 
     def setOrientation(self, orient):
         x = self._text.x
@@ -112,9 +114,6 @@ class Text(Shape):
         pass
 
     def transform(self, transform: Transform) -> None:
-        transformedText = self._text.transformed(transform.transform)
-        shape = Shape.getCell().shapes(self.getShape().layer).insert(transformedText)
-        self.destroy()
-        self._text = transformedText
-        self.set_shape(shape)
+        self._text = self._text.transformed(transform.transform)
+        self._replaceShape(self._text)
 
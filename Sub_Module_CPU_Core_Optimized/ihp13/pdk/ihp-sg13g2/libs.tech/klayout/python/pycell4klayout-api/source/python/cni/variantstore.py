@@ -0,0 +1,150 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the GNU General Public License, Version 3.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.gnu.org/licenses/gpl-3.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+import pya
+
+import os
+import hashlib
+import marshal
+import tempfile
+
+
+class PCellVariantStore(object):
+    """
+    Content-addressed directory of prebuilt PCell variants, shared by all sessions and processes
+    using the same directory.
+
+    A variant is stored as one file '<storeDir>/<pcellName>/<key>.variant', the key being the
+    hash of the PCell name, the database unit, the canonicalized parameter values and 'codeHash',
+    which has to identify the code and the technology data the variants are generated with.
+
+    The file holds the shapes of each layer in the string representation of KLayout (see
+    Text.from_s etc.), as unlike GDS or OASIS it keeps all text attributes and round path ends.
+    Files are written to a temporary file and renamed, so concurrent writers are safe. The files
+    get the permissions of a newly created file (as set by the umask), so other users sharing the
+    directory can read them.
+
+    """
+
+    FORMAT_VERSION = 1
+
+    _shapeTypes = {
+        'box': pya.Box,
+        'path': pya.Path,
+        'text': pya.Text,
+        'simple_polygon': pya.SimplePolygon,
+        'polygon': pya.Polygon,
+        'edge': pya.Edge,
+        'edge_pair': pya.EdgePair,
+        'point': pya.Point
+    }
+
+    def __init__(self, storeDir: str, codeHash: str):
+        self._storeDir = storeDir
+        self._codeHash = codeHash
+
+    @property
+    def storeDir(self) -> str:
+        return self._storeDir
+
+    def key(self, pcellName: str, dbu: float, params: tuple) -> str:
+        hash = hashlib.sha256()
+        hash.update(f"{PCellVariantStore.FORMAT_VERSION}:{self._codeHash}:{pcellName}:{dbu!r}".encode())
+        for value in params:
+            hash.update(b'\0' + repr(value).encode())
+        return hash.hexdigest()
+
+    def path(self, pcellName: str, key: str) -> str:
+        return os.path.join(self._storeDir, pcellName, f"{key}.variant")
+
+    def load(self, pcellName: str, key: str, cell) -> bool:
+        """
+        Inserts the shapes of the stored variant into 'cell'. Returns False if the variant isn't
+        stored yet.
+
+        """
+        try:
+            with open(self.path(pcellName, key), 'rb') as variantFile:
+                variant = marshal.load(variantFile)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+
+        layout = cell.layout()
+        for layer, datatype, name, shapes in variant:
+            cellShapes = cell.shapes(layout.layer(pya.LayerInfo(layer, datatype, name)))
+            for shapeType, shape in shapes:
+                cellShapes.insert(PCellVariantStore._shapeTypes[shapeType].from_s(shape))
+
+        return True
+
+    def save(self, pcellName: str, key: str, cell):
+        """
+        Stores the shapes of 'cell' as variant. Cells containing instances aren't stored.
+
+        """
+        if cell.child_instances() > 0:
+            return
+
+        layout = cell.layout()
+        variant = []
+        for layerIndex in layout.layer_indexes():
+            cellShapes = cell.shapes(layerIndex)
+            if cellShapes.is_empty():
+                continue
+
+            shapes = []
+            for shape in cellShapes.each():
+                if shape.is_box():
+                    shapes.append(('box', str(shape.box)))
+                elif shape.is_path():
+                    shapes.append(('path', str(shape.path)))
+                elif shape.is_text():
+                    shapes.append(('text', str(shape.text)))
+                elif shape.is_simple_polygon():
+                    shapes.append(('simple_polygon', str(shape.simple_polygon)))
+                elif shape.is_polygon():
+                    shapes.append(('polygon', str(shape.polygon)))
+                elif shape.is_edge():
+                    shapes.append(('edge', str(shape.edge)))
+                elif shape.is_edge_pair():
+                    shapes.append(('edge_pair', str(shape.edge_pair)))
+                elif shape.is_point():
+                    shapes.append(('point', str(shape.point)))
+                else:
+                    # not representable, don't store an incomplete variant
+                    return
+
+            layerInfo = layout.get_info(layerIndex)
+            variant.append((layerInfo.layer, layerInfo.datatype, layerInfo.name, shapes))
+
+        variantPath = self.path(pcellName, key)
+        tmpVariantPath = None
+        try:
+            os.makedirs(os.path.dirname(variantPath), exist_ok=True)
+            fd, tmpVariantPath = tempfile.mkstemp(prefix=f".{key}-", dir=os.path.dirname(variantPath))
+            with os.fdopen(fd, 'wb') as variantFile:
+                marshal.dump(variant, variantFile)
+            # mkstemp creates the file readable by the owner only, the store may be shared by other users
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmpVariantPath, 0o666 & ~umask)
+            os.replace(tmpVariantPath, variantPath)
+        except OSError as error:
+            pya.Logger.warn(f"PCellVariantStore: can't store variant '{variantPath}': {error}")
+            if tmpVariantPath is not None and os.path.exists(tmpVariantPath):
+                os.remove(tmpVariantPath)
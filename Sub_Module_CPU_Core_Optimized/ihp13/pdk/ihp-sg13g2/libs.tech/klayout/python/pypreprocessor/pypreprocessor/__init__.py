@@ -7,10 +7,25 @@ __version__ = '0.8.0'
 
 import sys
 import os
+import re
 import traceback
 import imp
 import importlib
+import importlib.abc
+import importlib.util
+import functools
 import io
+
+# directives in the order they are matched, a directive must come before any shorter directive
+# being a prefix of it
+DIRECTIVES = ('define', 'undef', 'exclude', 'endexclude', 'ifdefnot', 'ifdef', 'elseif', 'else',
+              'endififdef', 'endifall', 'endif')
+
+# tokenizer for directive lines, compiled once per escape sequence
+@functools.lru_cache(maxsize=None)
+def directive_regex(escape):
+    return re.compile(re.escape(escape) + '(' + '|'.join(DIRECTIVES) + ')')
+
 class preprocessor:
     def __init__(self, inFile=sys.argv[0], outFile='', defines=[], \
             removeMeta=False, escapeChar=None, mode=None, escape='#', \
@@ -33,8 +48,9 @@ class preprocessor:
         self.__excludeblock = False
         self.__ifblocks = []
         self.__ifconditions = []
+        self.__falseblocks = 0
         self.__evalsquelch = True
-        self.__outputBuffer = ''
+        self.__outputBuffer = []
 
     def check_deprecation(self):
         def deprecation(message):
@@ -73,8 +89,9 @@ class preprocessor:
         self.__excludeblock = False
         self.__ifblocks = []
         self.__ifconditions = []
+        self.__falseblocks = 0
         self.__evalsquelch = True
-        self.__outputBuffer = ''
+        self.__outputBuffer = []
 
     # the #define directive
     def define(self, define):
@@ -92,12 +109,30 @@ class preprocessor:
         else:
             return False
 
+    # if-block stack, the number of false blocks is tracked to evaluate the stack in O(1)
+    def __push_block(self, value, condition):
+        self.__ifblocks.append(value)
+        self.__ifconditions.append(condition)
+        if not value:
+            self.__falseblocks += 1
+
+    def __pop_block(self):
+        if not self.__ifblocks.pop(-1):
+            self.__falseblocks -= 1
+        self.__ifcondition = self.__ifconditions.pop(-1)
+
+    def __toggle_block(self):
+        self.__ifblocks[-1] = not self.__ifblocks[-1]
+        self.__falseblocks += -1 if self.__ifblocks[-1] else 1
+
+    def __clear_blocks(self):
+        self.__ifblocks = []
+        self.__ifconditions = []
+        self.__falseblocks = 0
+
     #returning: validness of #ifdef #else block
     def __if(self):
-        value = bool(self.__ifblocks)
-        for ib in self.__ifblocks:
-            value *= ib   #* represents and: value = value and ib
-        return not value    #not: because True means removing
+        return not self.__ifblocks or self.__falseblocks > 0    #True means removing
 
     # evaluate
     def lexer(self, line):
@@ -106,47 +141,49 @@ class preprocessor:
             if 'pypreprocessor.parse()' in line:
                 return True, True
             #this block only for faster processing (not necessary)
-            elif line[:len(self.escape)] != self.escape:
+            elif not line.startswith(self.escape):
                 return False, False
+        match = directive_regex(self.escape).match(line)
+        directive = match.group(1) if match else None
+        if directive is not None:
+            splitted_line = line.split()
         # handle #define directives
-        if line[:len(self.escape) + 6] == self.escape + 'define':
-            if len(line.split()) != 2:
+        if directive == 'define':
+            if len(splitted_line) != 2:
                 self.exit_error(self.escape + 'define')
             else:
-                self.define(line.split()[1])
+                self.define(splitted_line[1])
                 return False, True
         # handle #undef directives
-        elif line[:len(self.escape) + 5] == self.escape + 'undef':
-            if len(line.split()) != 2:
+        elif directive == 'undef':
+            if len(splitted_line) != 2:
                 self.exit_error(self.escape + 'undef')
             else:
-                self.undefine(line.split()[1])
+                self.undefine(splitted_line[1])
                 return False, True
         # handle #exclude directives
-        elif line[:len(self.escape) + 7] == self.escape + 'exclude':
-            if len(line.split()) != 1:
+        elif directive == 'exclude':
+            if len(splitted_line) != 1:
                 self.exit_error(self.escape + 'exclude')
             else:
                 self.__excludeblock = True
                 return False, True
         # handle #endexclude directives
-        elif line[:len(self.escape) + 10] == self.escape + 'endexclude':
-            if len(line.split()) != 1:
+        elif directive == 'endexclude':
+            if len(splitted_line) != 1:
                 self.exit_error(self.escape + 'endexclude')
             else:
                 self.__excludeblock = False
                 return False, True
         # handle #ifnotdef directives (is the same as: #ifdef X #else)
-        elif line[:len(self.escape) + 8] == self.escape + 'ifdefnot':
-            if len(line.split()) != 2:
+        elif directive == 'ifdefnot':
+            if len(splitted_line) != 2:
                 self.exit_error(self.escape + 'ifdefnot')
             else:
-                self.__ifblocks.append(not self.search_defines(line.split()[1]))
-                self.__ifconditions.append(line.split()[1])
+                self.__push_block(not self.search_defines(splitted_line[1]), splitted_line[1])
                 return False, True
         # handle #ifdef directives
-        elif line[:len(self.escape) + 5] == self.escape + 'ifdef':
-            splitted_line = line.split()
+        elif directive == 'ifdef':
             if len(splitted_line) < 2 or len(splitted_line) % 2 != 0:
                 self.exit_error(self.escape + 'ifdef')
             for i, val in enumerate(splitted_line):
@@ -158,54 +195,46 @@ class preprocessor:
                 if i % 2 == 1:
                     defined = defined or self.search_defines(val)
 
-            self.__ifblocks.append(defined)
-            self.__ifconditions.append(line.split()[1])
+            self.__push_block(defined, splitted_line[1])
             return False, True
         # handle #else...
         # handle #elseif directives
-        elif line[:len(self.escape) + 6] == self.escape + 'elseif':
-            if len(line.split()) != 2:
+        elif directive == 'elseif':
+            if len(splitted_line) != 2:
                 self.exit_error(self.escape + 'elseif')
             else:
-                self.__ifblocks[-1] = not self.__ifblocks[-1]
-                  #self.search_defines(self.__ifconditions[-1]))
-                self.__ifblocks.append(self.search_defines(line.split()[1]))
-                self.__ifconditions.append(line.split()[1])
+                self.__toggle_block()
+                self.__push_block(self.search_defines(splitted_line[1]), splitted_line[1])
             return False, True
         # handle #else directives
-        elif line[:len(self.escape) + 4] == self.escape + 'else':
-            if len(line.split()) != 1:
+        elif directive == 'else':
+            if len(splitted_line) != 1:
                 self.exit_error(self.escape + 'else')
             else:
-                self.__ifblocks[-1] = not self.__ifblocks[-1]
-                  #self.search_defines(self.__ifconditions[-1]))
+                self.__toggle_block()
             return False, True
         # handle #endif..
         # handle #endififdef
-        elif line[:len(self.escape) + 10] == self.escape + 'endififdef':
-            if len(line.split()) != 2:
+        elif directive == 'endififdef':
+            if len(splitted_line) != 2:
                 self.exit_error(self.escape + 'endififdef')
             else:
                 if len(self.__ifconditions) >= 1:
-                    self.__ifblocks.pop(-1)
-                    self.__ifcondition = self.__ifconditions.pop(-1)
+                    self.__pop_block()
                 else:
-                    self.__ifblocks = []
-                    self.__ifconditions = []
-                self.__ifblocks.append(self.search_defines(line.split()[1]))
-                self.__ifconditions.append(line.split()[1])
+                    self.__clear_blocks()
+                self.__push_block(self.search_defines(splitted_line[1]), splitted_line[1])
                 return False, True
         # handle #endifall directives
-        elif line[:len(self.escape) + 8] == self.escape + 'endifall':
-            if len(line.split()) != 1:
+        elif directive == 'endifall':
+            if len(splitted_line) != 1:
                 self.exit_error(self.escape + 'endifall')
             else:
-                self.__ifblocks = []
-                self.__ifconditions = []
+                self.__clear_blocks()
                 return False, True
         # handle #endif and #endif numb directives
-        elif line[:len(self.escape) + 5] == self.escape + 'endif':
-            if len(line.split()) != 1:
+        elif directive == 'endif':
+            if len(splitted_line) != 1:
                 self.exit_error(self.escape + 'endif number')
             else:
                 try:
@@ -216,16 +245,13 @@ class preprocessor:
                     number = 1
                 if len(self.__ifconditions) > number:
                     for i in range(0, number):
-                        self.__ifblocks.pop(-1)
-                        self.__ifcondition = self.__ifconditions.pop(-1)
+                        self.__pop_block()
                 elif len(self.__ifconditions) == number:
-                    self.__ifblocks = []
-                    self.__ifconditions = []
+                    self.__clear_blocks()
                 else:
                     print('Warning try to remove more blocks than present', \
                       self.input, self.__linenum)
-                    self.__ifblocks = []
-                    self.__ifconditions = []
+                    self.__clear_blocks()
                 return False, True
         else: #No directive --> execute
             # process the excludeblock
@@ -250,6 +276,46 @@ class preprocessor:
             print(line.replace("\"<string>\"", self.input))
 
     # parsing/processing
+    def __process(self, lines):
+        for line in lines:
+            self.__linenum += 1
+            # to squelch or not to squelch
+            squelch, metaData = self.lexer(line)
+            # process and output
+            if self.removeMeta is True:
+                if metaData is True or squelch is True:
+                    continue
+            if squelch is True:
+                if metaData:
+                    self.__outputBuffer.append(self.escape + line)
+                else:
+                    self.__outputBuffer.append(self.escape[0] + line)
+                continue
+            if squelch is False:
+                self.__outputBuffer.append(line)
+                continue
+
+    #Warnings for unclosed #ifdef blocks
+    def __warn_unclosed(self, ask):
+        if self.__ifblocks:
+            print('Warning: Number of unclosed Ifdefblocks: ', len(self.__ifblocks))
+            print('Can cause unwished behaviour in the preprocessed code, preprocessor is safe')
+            if not ask:
+                return
+            try:
+                select = input('Do you want more Information? ')
+            except SyntaxError:
+                select = 'no'
+            select = select.lower()
+            if select in ('yes', 'true', 'y', '1'):
+                print('Name of input and output file: ', self.input, ' ', self.output)
+                for i, item in enumerate(self.__ifconditions):
+                    if (item in self.defines) != self.__ifblocks[i]:
+                        cond = ' else '
+                    else:
+                        cond = ' if '
+                    print('Block:', item, ' is in condition: ', cond)
+
     def parse(self):
         self.__reset_internal()
         self.check_deprecation()
@@ -257,44 +323,22 @@ class preprocessor:
         input_file = io.open(os.path.join(self.input), 'r', encoding=self.readEncoding)
         try:
             # process the input file
-            for line in input_file:
-                self.__linenum += 1
-                # to squelch or not to squelch
-                squelch, metaData = self.lexer(line)
-                # process and output
-                if self.removeMeta is True:
-                    if metaData is True or squelch is True:
-                        continue
-                if squelch is True:
-                    if metaData:
-                        self.__outputBuffer += self.escape + line
-                    else:
-                        self.__outputBuffer += self.escape[0] + line
-                    continue
-                if squelch is False:
-                    self.__outputBuffer += line
-                    continue
+            self.__process(input_file)
         finally:
             input_file.close()
-            #Warnings for unclosed #ifdef blocks
-            if self.__ifblocks:
-                print('Warning: Number of unclosed Ifdefblocks: ', len(self.__ifblocks))
-                print('Can cause unwished behaviour in the preprocessed code, preprocessor is safe')
-                try:
-                    select = input('Do you want more Information? ')
-                except SyntaxError:
-                    select = 'no'
-                select = select.lower()
-                if select in ('yes', 'true', 'y', '1'):
-                    print('Name of input and output file: ', self.input, ' ', self.output)
-                    for i, item in enumerate(self.__ifconditions):
-                        if (item in self.defines) != self.__ifblocks[i]:
-                            cond = ' else '
-                        else:
-                            cond = ' if '
-                        print('Block:', item, ' is in condition: ', cond)
+            self.__warn_unclosed(ask=True)
         self.post_process()
 
+    # string in/string out, no files are touched and nothing is run
+    def parse_string(self, source):
+        self.__reset_internal()
+        self.check_deprecation()
+        try:
+            self.__process(source.splitlines(keepends=True))
+        finally:
+            self.__warn_unclosed(ask=False)
+        return ''.join(self.__outputBuffer)
+
     # post-processor
     def post_process(self):
         try:
@@ -304,7 +348,7 @@ class preprocessor:
             # open file for output
             output_file = io.open(self.output, 'w', encoding=self.writeEncoding)
             # write post-processed code to file
-            output_file.write(self.__outputBuffer)
+            output_file.write(''.join(self.__outputBuffer))
         finally:
             output_file.close()
 
@@ -347,4 +391,28 @@ class preprocessor:
         except:
             self.rewrite_traceback()
 
+# importlib loader running the preprocessed source of a module straight from memory
+#   as the line numbers are preserved (removeMeta is not supported), tracebacks refer to the
+#   original file
+class PreprocessedSourceLoader(importlib.abc.SourceLoader):
+    def __init__(self, path, defines=[], escape='#'):
+        self.path = path
+        self.defines = defines
+        self.escape = escape
+
+    def get_filename(self, fullname):
+        return self.path
+
+    def get_data(self, path):
+        with io.open(path, 'rb') as input_file:
+            return input_file.read()
+
+    def get_source(self, fullname):
+        source = importlib.util.decode_source(self.get_data(self.path))
+        pp = preprocessor(self.path, defines=list(self.defines), escape=self.escape, run=False, resume=True, save=False)
+        return pp.parse_string(source)
+
+    def get_code(self, fullname):
+        return compile(self.get_source(fullname), self.path, 'exec', dont_inherit=True)
+
 pypreprocessor = preprocessor()
@@ -5,7 +5,9 @@
 import sys
 import os
 import unittest
+import importlib.util
 from pypreprocessor import pypreprocessor
+from pypreprocessor import preprocessor, PreprocessedSourceLoader
 pypreprocessor.readEncoding = 'utf-8'
 pypreprocessor.writeEncoding = 'utf-8'
 
@@ -20,6 +22,7 @@ def testsuite():
     suite = unittest.TestSuite()
     suite.addTests(unittest.makeSuite(FileParseTest))
     suite.addTests(unittest.makeSuite(CapturePrintTest))
+    suite.addTests(unittest.makeSuite(StringParseTest))
     return suite
 
 @contextmanager
@@ -171,6 +174,67 @@ class CapturePrintTest(unittest.TestCase, TestTemplate):
         super(CapturePrintTest, self).tearDown()
         pass
     pass
+
+# Parses parsetarget.py from memory and runs it through the import loader
+class StringParseTest(unittest.TestCase):
+    def setUp(self):
+        super(StringParseTest, self).setUp()
+        self.input = os.path.join(os.path.dirname(__file__), 'parsetarget.py')
+        self.output = os.path.join(os.path.dirname(__file__), self._testMethodName)
+        with io.open(self.input, 'r', encoding='utf-8') as f:
+            self.source = f.read()
+        pass
+
+    def tearDown(self):
+        if(os.path.exists(self.output)):
+            os.remove(self.output)
+        super(StringParseTest, self).tearDown()
+        pass
+
+    def parse_file(self, defines, removeMeta):
+        pp = preprocessor(self.input, self.output, defines, removeMeta=removeMeta, run=False, resume=True)
+        pp.readEncoding = 'utf-8'
+        pp.writeEncoding = 'utf-8'
+        pp.parse()
+        with io.open(self.output, 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_parse_string_equals_parse(self):
+        for defines in ([], ['printTest']):
+            for removeMeta in (False, True):
+                pp = preprocessor(self.input, defines=list(defines), removeMeta=removeMeta)
+                self.assertEqual(pp.parse_string(self.source), self.parse_file(list(defines), removeMeta))
+        pass
+
+    def test_parse_string_keeps_lines(self):
+        pp = preprocessor(defines=['printTest'])
+        output = pp.parse_string(self.source)
+        self.assertEqual(len(output.splitlines()), len(self.source.splitlines()))
+        self.assertIn('#a-=50', output)
+        self.assertIn('\na+=50', output)
+        pass
+
+    def test_nested_blocks(self):
+        source = '#ifdef A\n#ifdef B\nab\n#else\na\n#endif\n#else\nnone\n#endif\nall\n'
+        pp = preprocessor(defines=['A'], removeMeta=True)
+        self.assertEqual(pp.parse_string(source), 'a\nall\n')
+        pp = preprocessor(defines=['A', 'B'], removeMeta=True)
+        self.assertEqual(pp.parse_string(source), 'ab\nall\n')
+        pp = preprocessor(defines=['B'], removeMeta=True)
+        self.assertEqual(pp.parse_string(source), 'none\nall\n')
+        pass
+
+    def test_loader(self):
+        loader = PreprocessedSourceLoader(self.input, ['printTest'])
+        spec = importlib.util.spec_from_file_location('parsetarget', self.input, loader=loader)
+        module = importlib.util.module_from_spec(spec)
+        with captured_output() as (out, err):
+            loader.exec_module(module)
+        self.assertEqual(module.a, 200)
+        self.assertIn('Hello, world!', out.getvalue().splitlines())
+        self.assertFalse(os.path.exists(self.output))
+        pass
+    pass
 #endexclude
 
 if(__name__ == 'main'):
@@ -0,0 +1,259 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+"""
+Batch generation of SG13_dev PCell variants.
+
+Reads a list of variants and writes them, placed as requested, into one GDS or OASIS library.
+The variants are generated by a pool of worker processes, each loading the SG13_dev library
+once and writing its share of the variants into a layout of its own, which are merged at the end.
+
+Usage (requires the klayout Python module):
+
+    python sg13g2_pycell_batch.py variants.csv -o variants.gds -j 8
+
+The variant list is either a CSV file with the columns 'pcell', 'x', 'y' and optionally 'rot'
+(degrees) and 'mirror' (mirrored at the x-axis before rotating), all other columns being PCell
+parameters; empty cells keep the default value of the parameter:
+
+    pcell,x,y,l,w,ng
+    nmos,0,0,0.35e-6,6e-6,3
+    pmos,10,0,0.35e-6,6e-6,3
+
+or a YAML file (requires PyYAML) holding a list of variants:
+
+    - pcell: rppd
+      params: {w: 5u, b: 3}
+      x: 0
+      y: 20
+
+Coordinates are given in micrometers. The output format is chosen by the file extension.
+
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pycell4klayout-api', 'source', 'python'))
+
+import pya
+
+# registers the SG13_dev library, once per process
+import sg13g2_pycell_lib
+
+import csv
+import math
+import argparse
+import tempfile
+import multiprocessing
+
+LIBRARY_NAME = 'SG13_dev'
+
+PLACEMENT_COLUMNS = ('pcell', 'x', 'y', 'rot', 'mirror')
+
+
+def parseBool(value: str) -> bool:
+    if value.strip().lower() in ('1', 'true', 'yes', 'on'):
+        return True
+    if value.strip().lower() in ('0', 'false', 'no', 'off'):
+        return False
+    raise ValueError(f"Invalid boolean '{value}'")
+
+
+def coerceParams(pcellName: str, params: dict) -> dict:
+    """
+    Converts the parameter values given as strings to the types declared by the PCell 'pcellName'.
+
+    """
+    declaration = pya.Library.library_by_name(LIBRARY_NAME).layout().pcell_declaration(pcellName)
+    if declaration is None:
+        raise Exception(f"Unknown PCell '{pcellName}' in library {LIBRARY_NAME}")
+
+    paramTypes = {param_decl.name: param_decl.type for param_decl in declaration.get_parameters()}
+
+    coercedParams = {}
+    for name, value in params.items():
+        if name not in paramTypes:
+            raise Exception(f"Unknown parameter '{name}' of PCell '{pcellName}'")
+        if type(value) is str:
+            if paramTypes[name] == pya.PCellParameterDeclaration.TypeDouble:
+                value = float(value)
+            elif paramTypes[name] == pya.PCellParameterDeclaration.TypeInt:
+                value = int(value)
+            elif paramTypes[name] == pya.PCellParameterDeclaration.TypeBoolean:
+                value = parseBool(value)
+        coercedParams[name] = value
+
+    return coercedParams
+
+
+def readCsvVariants(path: str) -> list:
+    variants = []
+    with open(path, 'r', newline='') as csvFile:
+        for row in csv.DictReader(csvFile):
+            params = {name: value for name, value in row.items()
+                      if name not in PLACEMENT_COLUMNS and value is not None and value.strip() != ''}
+            variants.append({
+                'pcell': row['pcell'].strip(),
+                'params': params,
+                'x': row.get('x') or 0,
+                'y': row.get('y') or 0,
+                'rot': row.get('rot') or 0,
+                'mirror': parseBool(row.get('mirror') or 'false')
+            })
+    return variants
+
+
+def readYamlVariants(path: str) -> list:
+    try:
+        import yaml
+    except ImportError:
+        raise Exception("Reading YAML variant lists requires PyYAML (pip install pyyaml)")
+
+    with open(path, 'r') as yamlFile:
+        entries = yaml.safe_load(yamlFile) or []
+
+    variants = []
+    for entry in entries:
+        mirror = entry.get('mirror', False)
+        variants.append({
+            'pcell': entry['pcell'],
+            'params': entry.get('params') or {},
+            'x': entry.get('x', 0),
+            'y': entry.get('y', 0),
+            'rot': entry.get('rot', 0),
+            'mirror': parseBool(mirror) if type(mirror) is str else bool(mirror)
+        })
+    return variants
+
+
+def readVariants(path: str) -> list:
+    """
+    Returns the variants listed in the CSV or YAML file 'path', with parameters converted to the
+    declared types.
+
+    """
+    if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+        variants = readYamlVariants(path)
+    else:
+        variants = readCsvVariants(path)
+
+    for variant in variants:
+        variant['params'] = coerceParams(variant['pcell'], variant['params'])
+        for coordinate in ('x', 'y', 'rot'):
+            variant[coordinate] = float(variant[coordinate])
+
+    return variants
+
+
+def generateVariants(task) -> str:
+    """
+    Worker: generates the variants of one chunk into a new layout and writes it to 'partPath'. Each
+    chunk entry is a variant with all of its placements, so the variant is produced once.
+
+    The part is written without PCell context information, so the PCell variants are read back as
+    static cells and the merge only copies their geometry.
+
+    """
+    partPath, groups = task
+
+    layout = pya.Layout()
+    top = layout.create_cell('TOP')
+    for pcellName, params, placements in groups:
+        cell = layout.create_cell(pcellName, LIBRARY_NAME, params)
+        if cell is None:
+            raise Exception(f"Unknown PCell '{pcellName}' in library {LIBRARY_NAME}")
+        for variant in placements:
+            trans = pya.DCplxTrans(1.0, variant['rot'], variant['mirror'], variant['x'], variant['y'])
+            top.insert(pya.DCellInstArray(cell.cell_index(), trans))
+
+    saveOptions = pya.SaveLayoutOptions()
+    saveOptions.write_context_info = False
+    layout.write(partPath, saveOptions)
+    return partPath
+
+
+def groupVariants(variants: list) -> list:
+    """
+    Returns the variants grouped by PCell and parameters as (pcellName, params, placements) tuples,
+    in the order of their first occurrence.
+
+    """
+    groups = {}
+    for variant in variants:
+        key = (variant['pcell'], repr(sorted(variant['params'].items())))
+        if key not in groups:
+            groups[key] = (variant['pcell'], variant['params'], [])
+        groups[key][2].append(variant)
+    return list(groups.values())
+
+
+def generateBatch(variants: list, outputPath: str, jobs: int = None, topCellName: str = 'TOP'):
+    """
+    Generates 'variants' using 'jobs' worker processes and writes them below the cell
+    'topCellName' to 'outputPath'.
+
+    """
+    jobs = jobs or os.cpu_count() or 1
+
+    # identical variants are produced only once and placed as often as listed
+    groups = groupVariants(variants)
+    chunkSize = max(1, math.ceil(len(groups) / (jobs * 4)))
+
+    partSuffix = '.oas' if outputPath.lower().endswith('.oas') else '.gds'
+
+    with tempfile.TemporaryDirectory(prefix='sg13g2_pycell_batch-') as partDir:
+        tasks = [(os.path.join(partDir, f"part{index}{partSuffix}"), groups[start:start + chunkSize])
+                 for index, start in enumerate(range(0, len(groups), chunkSize))]
+
+        if jobs > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(min(jobs, len(tasks))) as pool:
+                partPaths = pool.map(generateVariants, tasks, chunksize=1)
+        else:
+            partPaths = [generateVariants(task) for task in tasks]
+
+        layout = pya.Layout()
+        top = layout.create_cell(topCellName)
+        for partPath in partPaths:
+            partLayout = pya.Layout()
+            partLayout.read(partPath)
+            layout.dbu = partLayout.dbu
+            top.copy_tree(partLayout.top_cell())
+
+    layout.write(outputPath)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description=f"Generates the {LIBRARY_NAME} PCell variants listed in a CSV or YAML file.")
+    parser.add_argument('variants', help="CSV or YAML file listing the variants")
+    parser.add_argument('-o', '--output', required=True, help="output GDS or OASIS file")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="number of worker processes (default: number of CPUs)")
+    parser.add_argument('--top', default='TOP', help="name of the top cell (default: TOP)")
+    args = parser.parse_args(argv)
+
+    variants = readVariants(args.variants)
+    generateBatch(variants, args.output, args.jobs, args.top)
+
+    print(f"{len(variants)} variants written to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
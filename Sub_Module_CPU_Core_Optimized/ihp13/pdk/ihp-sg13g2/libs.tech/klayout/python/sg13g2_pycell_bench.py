@@ -0,0 +1,168 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+"""
+Micro benchmarks of the cni API used by the SG13_dev PCells.
+
+Usage (requires the klayout Python module):
+
+    python sg13g2_pycell_bench.py memory -n 20000
+    python sg13g2_pycell_bench.py clone -n 5000
+
+memory: creates n objects of each cni type in the context of a PCell layout and reports the
+        Python memory (as traced by tracemalloc) held per object once the shapes are inserted
+        into the cell. This includes the Python wrappers of the KLayout objects (pya.DBox etc.),
+        but not the memory allocated by KLayout itself.
+
+clone:  creates n shapes of each cni shape type and reports the time per shape taken by clone()
+        and, for comparison, by copy.deepcopy() of the shape.
+
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pycell4klayout-api', 'source', 'python'))
+
+import pya
+
+# registers the SG13_dev library
+import sg13g2_pycell_lib
+
+from cni.dlo import *
+
+import gc
+import copy
+import time
+import argparse
+import tracemalloc
+
+LIBRARY_NAME = 'SG13_dev'
+
+
+class BenchContext(object):
+    """
+    PyCellContext for a new cell, using the technology and implementation of the PCell 'pcellName'.
+
+    """
+
+    def __init__(self, pcellName: str = 'nmos'):
+        declaration = pya.Library.library_by_name(LIBRARY_NAME).layout().pcell_declaration(pcellName)
+        self._layout = pya.Layout()
+        self._cell = self._layout.create_cell('BENCH')
+        self._pyCellContext = PyCellContext(declaration.tech, self._cell, declaration._impl)
+        self._impl = declaration._impl
+
+    def __enter__(self):
+        self._pyCellContext.__enter__()
+        self._impl.addCellContext(self._cell)
+        return self
+
+    def __exit__(self, *params):
+        self._pyCellContext.__exit__(*params)
+
+    def flush(self):
+        self._pyCellContext.flushShapes()
+
+
+def measure(benchContext: BenchContext, create, count: int) -> float:
+    """
+    Returns the traced memory in bytes held per object by 'count' objects returned by 'create'.
+
+    """
+    gc.collect()
+    startMemory, _ = tracemalloc.get_traced_memory()
+    objects = [create(index) for index in range(count)]
+    benchContext.flush()
+    gc.collect()
+    memory, _ = tracemalloc.get_traced_memory()
+    bytesPerObject = (memory - startMemory) / count
+    del objects
+    return bytesPerObject
+
+
+def createShapes(layer: Layer) -> list:
+    """
+    Returns (name, create) of the cni shape types, 'create' creates a shape from an index.
+
+    """
+    return [
+        ('Rect', lambda index: Rect(layer, Box(index * 0.01, 0.0, index * 0.01 + 0.005, 1.0))),
+        ('Polygon', lambda index: Polygon(layer, PointList([Point(index * 0.01, 0.0), Point(index * 0.01 + 0.005, 0.0),
+                                                            Point(index * 0.01 + 0.005, 1.0)]))),
+        ('Path', lambda index: Path(layer, 0.16, PointList([Point(index * 0.01, 0.0), Point(index * 0.01, 1.0)]))),
+        ('Text', lambda index: Text(layer, 'T', Point(index * 0.01, 0.0), 0.1))
+    ]
+
+
+def timePerObject(function, objects: list) -> float:
+    """
+    Returns the time in microseconds taken by 'function' per object of 'objects'.
+
+    """
+    start = time.perf_counter()
+    [function(obj) for obj in objects]
+    return (time.perf_counter() - start) * 1e6 / len(objects)
+
+
+def benchMemory(count: int):
+    tracemalloc.start()
+
+    with BenchContext() as benchContext:
+        layer = Layer('Metal1', 'drawing')
+
+        benchmarks = [
+            ('Point', lambda index: Point(index * 0.01, 0.0)),
+            ('Box', lambda index: Box(index * 0.01, 0.0, index * 0.01 + 0.005, 1.0))
+        ] + createShapes(layer)
+
+        print(f"{'type':<10} {'bytes/object':>12}")
+        for name, create in benchmarks:
+            print(f"{name:<10} {measure(benchContext, create, count):>12.1f}")
+
+    tracemalloc.stop()
+
+
+def benchClone(count: int):
+    with BenchContext() as benchContext:
+        layer = Layer('Metal1', 'drawing')
+
+        print(f"{'type':<10} {'clone us':>10} {'deepcopy us':>12}")
+        for name, create in createShapes(layer):
+            shapes = [create(index) for index in range(count)]
+            cloneTime = timePerObject(lambda shape: shape.clone(), shapes)
+            deepcopyTime = timePerObject(copy.deepcopy, shapes)
+            print(f"{name:<10} {cloneTime:>10.2f} {deepcopyTime:>12.2f}")
+            benchContext.flush()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Micro benchmarks of the cni API.")
+    parser.add_argument('benchmark', choices=['memory', 'clone'], help="benchmark to run")
+    parser.add_argument('-n', '--count', type=int, default=20000, help="number of objects (default: 20000)")
+    args = parser.parse_args(argv)
+
+    if args.benchmark == 'memory':
+        benchMemory(args.count)
+    elif args.benchmark == 'clone':
+        benchClone(args.count)
+
+
+if __name__ == '__main__':
+    main()
@@ -21,13 +21,22 @@ import os
 import sys
 
 from cni.tech import Tech
-from cni.dlo import PCellWrapper
+from cni.dlo import PyCellContext, PCellWrapper, LazyPCellWrapper
+from cni.dlogen import DloGen
+from cni.variantstore import PCellVariantStore
+from cni.profiler import PCellProfiler
 
-# Creates the SG13_dev technology
-from .sg13_tech import *
+from .startup_trace import startupTrace
+
+with startupTrace.phase('Tech.get'):
+    # Creates the SG13_dev technology
+    from .sg13_tech import *
 
 from pypreprocessor.pypreprocessor import preprocessor as preProcessor
 
+from .pycell_cache import PyCellCodeCache, hashFiles
+from .define_index import DefineIndex
+
 import pya
 
 import os
@@ -38,8 +47,10 @@ import re
 import importlib
 import importlib.util
 import pathlib
-import tempfile
 import traceback
+import functools
+import py_compile
+import concurrent.futures
 
 moduleNames = [
         'nmos_code',
@@ -65,6 +76,8 @@ moduleNames = [
         'dpantenna_code'
 ]
 
+@functools.lru_cache(maxsize=None)
+@startupTrace.traced('getProcessNames')
 def getProcessNames():
     processNames = []
     maxDepth = 10
@@ -120,6 +133,149 @@ def getProcessNames():
     return processNames
 
 
+@functools.lru_cache(maxsize=None)
+def getEnvironmentNames():
+    return frozenset(env.lower() for env in os.environ)
+
+
+@functools.lru_cache(maxsize=None)
+def isDefined(define):
+    """
+    Returns True if 'define' is considered as 'defined' (see below). The process chain and the
+    environment are only looked up once per process.
+
+    """
+    locDefine = define.lower()
+    for processName in getProcessNames():
+        if processName.find(locDefine) != -1:
+            return True
+    return locDefine in getEnvironmentNames()
+
+
+def compilePyCellModule(moduleName, modulePath, definesSet, sourceLoader, codeCache):
+    """
+    Returns the code object of the PyCell module 'moduleName' preprocessed with 'definesSet',
+    either from the cache or compiled from the source preprocessed in memory by 'sourceLoader'.
+
+    Doesn't touch any interpreter or KLayout state, so it can run in a worker thread.
+    On errors the traceback is printed and the exception is reraised.
+
+    """
+    if codeCache is not None:
+        with open(modulePath, 'rb') as moduleFile:
+            cacheKey = codeCache.key(moduleFile.read(), definesSet)
+
+        code = codeCache.load(moduleName, cacheKey)
+        if code is not None:
+            return code
+
+    try:
+        code = sourceLoader(modulePath, definesSet).get_code(moduleName)
+    except:
+        for line in traceback.format_exc().splitlines():
+            print(line)
+
+        raise
+
+    if codeCache is not None:
+        codeCache.store(moduleName, cacheKey, code)
+
+    return code
+
+
+def compileBytecode(modulePath):
+    """
+    Writes the bytecode of the plain module 'modulePath' to its __pycache__ location if it is
+    missing or stale, so the following import only has to load it.
+
+    """
+    if sys.dont_write_bytecode:
+        return
+
+    bytecodePath = importlib.util.cache_from_source(modulePath)
+    sourceStat = os.stat(modulePath)
+
+    try:
+        with open(bytecodePath, 'rb') as bytecodeFile:
+            header = bytecodeFile.read(16)
+        if header[:4] == importlib.util.MAGIC_NUMBER and \
+                int.from_bytes(header[4:8], 'little') == 0 and \
+                int.from_bytes(header[8:12], 'little') == int(sourceStat.st_mtime) & 0xFFFFFFFF and \
+                int.from_bytes(header[12:16], 'little') == sourceStat.st_size & 0xFFFFFFFF:
+            return
+    except OSError:
+        pass
+
+    try:
+        with startupTrace.phase('compile', os.path.basename(modulePath)[:-3]):
+            py_compile.compile(modulePath, cfile=bytecodePath, doraise=True,
+                               invalidation_mode=py_compile.PycInvalidationMode.TIMESTAMP)
+    except (py_compile.PyCompileError, OSError):
+        # reported by the import
+        pass
+
+
+def compilePyCellModules(moduleNames, moduleDefines, definesSets, sourceLoader, codeCache, jobs):
+    """
+    Compiles the PyCell modules 'moduleNames' and the bytecode of all plain modules in 'ihp'
+    using 'jobs' worker threads. Returns a dict mapping the names of the modules using conditional
+    compilation to the (finished) futures of compilePyCellModule.
+
+    """
+    ihpPath = os.path.join(os.path.dirname(__file__), 'ihp')
+    compiledModules = {}
+
+    def compileModule(moduleName, modulePath):
+        with startupTrace.phase('preprocess', moduleName):
+            return compilePyCellModule(moduleName, modulePath, definesSets[moduleName], sourceLoader, codeCache)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        for moduleName in moduleNames:
+            if len(moduleDefines[moduleName]) > 0:
+                modulePath = os.path.join(ihpPath, f"{moduleName}.py")
+                compiledModules[moduleName] = executor.submit(compileModule, moduleName, modulePath)
+
+        for fileName in os.listdir(ihpPath):
+            if fileName.endswith('.py') and fileName[:-3] not in compiledModules:
+                executor.submit(compileBytecode, os.path.join(ihpPath, fileName))
+
+    return compiledModules
+
+
+def loadPyCellModule(moduleName, modulePath, defines, definesSet, sourceLoader, codeCache, code=None):
+    """
+    Imports the PyCell module 'moduleName', preprocessing it with 'definesSet' if it uses
+    conditional compilation (i.e. 'defines' isn't empty). 'code' optionally holds the result of
+    compilePyCellModule for the module. Returns the module.
+
+    On errors the traceback is printed and the exception is reraised.
+
+    """
+    if len(defines) == 0:
+        with startupTrace.phase('exec_module', moduleName):
+            return importlib.import_module(f"{__name__}.ihp." + moduleName)
+
+    if code is None:
+        with startupTrace.phase('preprocess', moduleName):
+            code = compilePyCellModule(moduleName, modulePath, definesSet, sourceLoader, codeCache)
+
+    loader = sourceLoader(modulePath, definesSet)
+    spec = importlib.util.spec_from_file_location(f"{__name__}.ihp.{moduleName}", modulePath, loader=loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[moduleName] = module
+
+    try:
+        with startupTrace.phase('exec_module', moduleName):
+            exec(code, module.__dict__)
+    except:
+        for line in traceback.format_exc().splitlines():
+            print(line)
+
+        raise
+
+    return module
+
+
 """
 Support for 'conditional compilation' in a C-style manner of PyCell code:
 
@@ -138,19 +294,62 @@ otherwise the #else-block is executed
 The current process chain will be dumped if the environment variable 'IHP_PYCELL_LIB_PRINT_PROCESS_TREE'
 is set.
 
+The names used in #ifdef-statements are taken from the index 'ihp/define_index.json' (see
+define_index.py), a module is only scanned if it has changed since the index was built. With the code
+cache, a module is only hashed again if its modification time or size has changed.
+
 The list of names which are used in an #ifdef-statement and are considered as 'defined' will be dumped
 if the environment variable 'IHP_PYCELL_LIB_PRINT_DEFINES_SET' is set.
 
+The startup phases can be traced by setting the environment variable 'IHP_PYCELL_LIB_TRACE' (see
+startup_trace.py).
+
+The modules are preprocessed in memory and run by an importlib loader (see PreprocessedSourceLoader
+in ihp/pypreprocessor.py), line numbers are preserved so tracebacks refer to the original module.
+The compiled code is kept in a persistent cache (see pycell_cache.py), so the preprocessor and the
+compilation only run if a module or the set of defines has changed.
+
+Modules which aren't in the cache yet are preprocessed and compiled concurrently, using as many
+worker threads as given by the environment variable 'IHP_PYCELL_LIB_JOBS' (default: number of CPUs,
+1 disables the concurrent compilation). The modules are still executed and registered in order.
+
+Produced layouts are kept in an LRU cache (see PCellGeometryCache in cni/dlo.py), so recreating a
+variant with the same parameters replays its shapes. The number of cached variants can be set via
+the environment variable 'IHP_PYCELL_LIB_GEOMETRY_CACHE_SIZE' (default: 128, 0 disables the cache).
+
+If the environment variable 'IHP_PYCELL_LIB_LAZY' is set, the PCells are registered from a parameter
+manifest kept in the cache and a PyCell module is only imported the first time one of its layouts is
+produced. The manifest is created by the first (eager) run and recreated whenever any PyCell source,
+the technology file or the set of defines changes.
+
+If the environment variable 'IHP_PYCELL_LIB_VARIANT_STORE' is set to a directory, produced layouts are
+also stored there (see PCellVariantStore in cni/variantstore.py) and reused by later sessions and by
+other processes sharing the directory. The variants are keyed by the hash of the PyCell and cni
+sources, the technology file and the set of defines, so changing any of them starts over.
+
+The shapes created while generating a layout are inserted in bulk once the layout is complete (see
+PyCellContext in cni/dlo.py). Setting the environment variable 'IHP_PYCELL_LIB_NO_BUFFERED_EMISSION'
+inserts each shape as soon as it is created.
+
+If the environment variable 'IHP_PYCELL_LIB_CONTACT_ARRAYS' is set, contact arrays are created as cell
+arrays of a contact cell per layer and size instead of one rectangle per contact, one cell array per
+run of uniform pitch (see DloGen.createRectArray in cni/dlogen.py).
+
+Setting the environment variable 'IHP_PYCELL_LIB_PROFILE' to a file name enables the profiling of the
+generated layouts (see PCellProfiler in cni/profiler.py): time, shapes per layer, geometric operations
+and memory peak are aggregated per PCell and parameter bucket and written to this file (CSV, or JSON
+if the name ends with '.json') at process exit.
+
 """
 class PyCellLib(pya.Library):
     def __init__(self):
         self.description = "IHP SG13G2 Pcells"
 
-        tech = Tech.get('SG13_dev')
-
-        processNames = getProcessNames()
+        with startupTrace.phase('Tech.get'):
+            tech = Tech.get('SG13_dev')
 
         if os.getenv('IHP_PYCELL_LIB_PRINT_PROCESS_TREE') is not None:
+            processNames = getProcessNames()
             processChain = ''
             isFirst = True
             for processName in reversed(processNames):
@@ -161,80 +360,118 @@ class PyCellLib(pya.Library):
             print(f'Current process chain: {processChain}')
 
         module = importlib.import_module(f"{__name__}.ihp.pypreprocessor")
-        preProcessor = getattr(module, "preprocessor")
+        sourceLoader = getattr(module, "PreprocessedSourceLoader")
 
-        definesSetToPrint = []
+        codeCache = PyCellCodeCache.fromEnvironment(getattr(module, "__version__", ''))
 
-        for moduleName in moduleNames:
-            defines = []
-            definesSet = []
+        defineIndex = DefineIndex(os.path.join(os.path.dirname(__file__), 'ihp'), codeCache)
 
-            modulePath = os.path.join(os.path.dirname(__file__), 'ihp', f"{moduleName}.py")
-            moduleFile = io.open(modulePath, 'r', encoding=sys.stdin.encoding)
+        moduleDefines = {}
+        definesSets = {}
+        definesSetToPrint = []
 
-            try:
-                for line in moduleFile:
-                    match = re.match(r'^#ifdef\s+\w+', line)
-                    if match:
-                        splittedLine = line.split()
-                        for i, define in enumerate(splittedLine):
-                            if i % 2 == 1:
-                                if define not in defines:
-                                    defines.append(define)
-
-            finally:
-                moduleFile.close()
-
-            envs = []
-            for env in os.environ:
-                envs.append(env.lower())
-
-            for define in defines:
-                locDefine = define.lower()
-                for processName in processNames:
-                    if processName.find(locDefine) != -1:
-                        definesSet.append(define)
-                else:
-                    if locDefine in envs:
-                        definesSet.append(define)
+        for moduleName in moduleNames:
+            with startupTrace.phase('define scan', moduleName):
+                defines = defineIndex.getDefines(moduleName)
+                definesSet = [define for define in defines if isDefined(define)]
 
             for defineSet in definesSet:
                 definesSetToPrint.append(defineSet)
 
-            modulePreProcPath = None
+            moduleDefines[moduleName] = defines
+            definesSets[moduleName] = definesSet
 
-            if len(defines) > 0:
-                modulePreProcPath = os.path.join(tempfile.gettempdir(), f"{moduleName}_pre.py")
+        defineIndex.storeStamps()
 
-                pyPreProcessor = preProcessor(modulePath, modulePreProcPath, definesSet, removeMeta=False, resume=True, run=False)
-                pyPreProcessor.parse()
+        manifest = None
+        manifestKey = None
 
-                spec = importlib.util.spec_from_file_location(f"{__name__}.ihp.{moduleName}", modulePreProcPath)
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[moduleName] = module
+        if os.getenv('IHP_PYCELL_LIB_LAZY') is not None and codeCache is not None:
+            ihpPath = os.path.join(os.path.dirname(__file__), 'ihp')
+            manifestPaths = [os.path.join(ihpPath, fileName) for fileName in sorted(os.listdir(ihpPath)) if fileName.endswith('.py')]
+            manifestPaths.append(os.path.join(os.path.dirname(__file__), 'sg13g2_tech.json'))
 
-                try:
-                    spec.loader.exec_module(module)
-                except:
-                    trace = traceback.format_exc().splitlines()
-                    for line in trace:
-                        print(line.replace(modulePreProcPath, modulePath))
+            manifestKey = codeCache.filesKey(manifestPaths, [f"{moduleName}:{define}" for moduleName in moduleNames for define in definesSets[moduleName]])
+            manifest = codeCache.loadManifest(manifestKey)
 
-                    sys.exit(1)
+        compiledModules = {}
 
-                os.remove(modulePreProcPath)
-            else:
-                module = importlib.import_module(f"{__name__}.ihp." + moduleName)
+        jobs = int(os.getenv('IHP_PYCELL_LIB_JOBS', min(32, os.cpu_count() or 1)))
+        if jobs > 1:
+            eagerModuleNames = [moduleName for moduleName in moduleNames
+                                if manifest is None or moduleName[:-len('_code')] not in manifest]
+            if len(eagerModuleNames) > 1:
+                compiledModules = compilePyCellModules(eagerModuleNames, moduleDefines, definesSets, sourceLoader, codeCache, jobs)
 
+        paramSpecs = {}
+
+        for moduleName in moduleNames:
             match = re.fullmatch(r'^(\S+)_code$', moduleName)
-            if match:
-                func = getattr(module, f"{match.group(1)}")
-                self.layout().register_pcell(match.group(1), PCellWrapper(func(), tech, modulePreProcPath, modulePath))
+            if not match:
+                continue
+
+            pcellName = match.group(1)
+            modulePath = os.path.join(os.path.dirname(__file__), 'ihp', f"{moduleName}.py")
+
+            def pyCellLoader(moduleName=moduleName, pcellName=pcellName, modulePath=modulePath, code=None):
+                module = loadPyCellModule(moduleName, modulePath, moduleDefines[moduleName], definesSets[moduleName],
+                                          sourceLoader, codeCache, code)
+                return getattr(module, pcellName)(), None, modulePath
+
+            if manifest is not None and pcellName in manifest:
+                with startupTrace.phase('PCellWrapper', moduleName):
+                    pcellWrapper = LazyPCellWrapper(manifest[pcellName], tech, pyCellLoader)
+                self.layout().register_pcell(pcellName, pcellWrapper)
+                continue
+
+            try:
+                code = compiledModules[moduleName].result() if moduleName in compiledModules else None
+                impl, modulePreProcPath, modulePath = pyCellLoader(code=code)
+            except:
+                sys.exit(1)
+
+            with startupTrace.phase('PCellWrapper', moduleName):
+                pcellWrapper = PCellWrapper(impl, tech, modulePreProcPath, modulePath)
+            paramSpecs[pcellName] = pcellWrapper.paramSpecs()
+
+            self.layout().register_pcell(pcellName, pcellWrapper)
+
+        if manifestKey is not None and manifest is None:
+            codeCache.storeManifest(manifestKey, paramSpecs)
 
         if os.getenv('IHP_PYCELL_LIB_PRINT_DEFINES_SET') is not None:
             print(f"Current defines set: {definesSetToPrint}")
 
-        self.register("SG13_dev")
+        geometryCacheSize = os.getenv('IHP_PYCELL_LIB_GEOMETRY_CACHE_SIZE')
+        if geometryCacheSize is not None:
+            PCellWrapper.geometryCache.maxSize = int(geometryCacheSize)
+
+        if os.getenv('IHP_PYCELL_LIB_NO_BUFFERED_EMISSION') is not None:
+            PyCellContext.bufferedEmission = False
+
+        if os.getenv('IHP_PYCELL_LIB_CONTACT_ARRAYS') is not None:
+            DloGen.rectArrays = True
+
+        profilePath = os.getenv('IHP_PYCELL_LIB_PROFILE')
+        if profilePath is not None and PCellProfiler.active is None:
+            PCellProfiler.active = PCellProfiler(profilePath)
+
+        variantStoreDir = os.getenv('IHP_PYCELL_LIB_VARIANT_STORE')
+        if variantStoreDir is not None:
+            ihpPath = os.path.join(os.path.dirname(__file__), 'ihp')
+            cniPath = os.path.dirname(sys.modules[PCellWrapper.__module__].__file__)
+            codePaths = [os.path.join(ihpPath, fileName) for fileName in sorted(os.listdir(ihpPath)) if fileName.endswith('.py')]
+            codePaths += [os.path.join(cniPath, fileName) for fileName in sorted(os.listdir(cniPath)) if fileName.endswith('.py')]
+            codePaths.append(os.path.join(os.path.dirname(__file__), 'sg13g2_tech.json'))
+
+            codeHash = hashFiles(codePaths).hex()
+            codeHash += ':' + ','.join(f"{moduleName}:{define}" for moduleName in moduleNames for define in definesSets[moduleName])
+            PCellWrapper.variantStore = PCellVariantStore(variantStoreDir, codeHash)
+
+        with startupTrace.phase('register'):
+            self.register("SG13_dev")
+
+        startupTrace.write()
 
 # instantiate and register the library
 PyCellLib()
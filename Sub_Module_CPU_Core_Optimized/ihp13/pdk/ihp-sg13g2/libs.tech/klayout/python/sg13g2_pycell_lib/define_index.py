@@ -0,0 +1,147 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+"""
+Index of the names used in '#ifdef'-statements of the PyCell modules.
+
+The index is built at development time and shipped as 'ihp/define_index.json' next to the modules,
+so loading the library doesn't need to scan the module sources line by line. Each entry holds the
+SHA-256 of the module it was built from; a module without a matching entry is scanned on the fly.
+With a code cache (see pycell_cache.py), the modification time and size of each module matching the
+index are remembered there, so a module is only read and hashed again once these have changed.
+
+Rebuild the index after changing an '#ifdef'-statement by running:
+
+    python define_index.py
+
+"""
+
+import os
+import re
+import json
+import hashlib
+
+DEFINE_INDEX_VERSION = 1
+DEFINE_INDEX_FILE = 'define_index.json'
+
+
+def scanDefines(source: str) -> list:
+    """
+    Returns the names used in '#ifdef'-statements of 'source' in order of appearance.
+
+    """
+    defines = []
+    for line in source.splitlines():
+        if re.match(r'^#ifdef\s+\w+', line):
+            splittedLine = line.split()
+            for i, define in enumerate(splittedLine):
+                if i % 2 == 1:
+                    if define not in defines:
+                        defines.append(define)
+    return defines
+
+
+def buildDefineIndex(modulesDir: str) -> dict:
+    index = {}
+    for fileName in sorted(os.listdir(modulesDir)):
+        if not fileName.endswith('_code.py'):
+            continue
+
+        with open(os.path.join(modulesDir, fileName), 'rb') as moduleFile:
+            source = moduleFile.read()
+
+        index[fileName[:-3]] = {
+            'sha256': hashlib.sha256(source).hexdigest(),
+            'defines': scanDefines(source.decode('utf-8'))
+        }
+
+    return {'version': DEFINE_INDEX_VERSION, 'modules': index}
+
+
+def fileStamp(path: str):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DefineIndex(object):
+
+    def __init__(self, modulesDir: str, codeCache = None):
+        self._modulesDir = modulesDir
+        self._modules = {}
+        self._codeCache = codeCache
+        self._stampsKey = None
+        self._stamps = {}
+        self._stampsChanged = False
+
+        indexPath = os.path.join(modulesDir, DEFINE_INDEX_FILE)
+        try:
+            with open(indexPath, 'r') as indexFile:
+                index = json.load(indexFile)
+            if index.get('version') == DEFINE_INDEX_VERSION:
+                self._modules = index['modules']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if codeCache is not None and self._modules:
+            # the stamps are only valid for the index they were checked against
+            self._stampsKey = codeCache.key(f"{indexPath}:{fileStamp(indexPath)}".encode(), [])
+            stamps = codeCache.loadSnapshot('define_index', self._stampsKey)
+            if isinstance(stamps, dict):
+                self._stamps = stamps
+
+    def getDefines(self, moduleName: str) -> list:
+        """
+        Returns the names used in '#ifdef'-statements of the module 'moduleName', from the
+        index if it is up to date for the module, otherwise by scanning the module.
+
+        """
+        modulePath = os.path.join(self._modulesDir, f"{moduleName}.py")
+        entry = self._modules.get(moduleName)
+
+        stamp = None
+        if self._stampsKey is not None:
+            stamp = fileStamp(modulePath)
+            if entry is not None and self._stamps.get(moduleName) == stamp:
+                return list(entry['defines'])
+
+        with open(modulePath, 'rb') as moduleFile:
+            source = moduleFile.read()
+
+        if entry is not None and entry['sha256'] == hashlib.sha256(source).hexdigest():
+            if stamp is not None:
+                self._stamps[moduleName] = stamp
+                self._stampsChanged = True
+            return list(entry['defines'])
+
+        return scanDefines(source.decode('utf-8'))
+
+    def storeStamps(self):
+        """
+        Stores the stamps of the modules found to match the index in the code cache, if any changed.
+
+        """
+        if self._stampsChanged:
+            self._codeCache.storeSnapshot('define_index', self._stampsKey, self._stamps)
+            self._stampsChanged = False
+
+
+if __name__ == '__main__':
+    modulesDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ihp')
+    with open(os.path.join(modulesDir, DEFINE_INDEX_FILE), 'w') as indexFile:
+        json.dump(buildDefineIndex(modulesDir), indexFile, indent=2)
+        indexFile.write('\n')
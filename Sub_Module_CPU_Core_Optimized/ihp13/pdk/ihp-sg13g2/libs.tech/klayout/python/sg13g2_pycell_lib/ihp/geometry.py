@@ -20,10 +20,12 @@ __version__ = "$Revision: #3 $"
 
 from cni.dlo import *
 from cni.geo import fgOr
-from cni.geo import fgAnd
 from cni.geo import fgXor
 from cni.geo import fgNot
+from cni.geo import fgOrList
+from cni.geo import fgAndList
 from .utility_functions import *
+from .grid_functions import *
 from math import *
 
 #***********************************************************************************************************************
@@ -77,13 +79,7 @@ def dbLayerOrList(layerId, shapes):
     if type(layerId) == str :
         layerId = Layer(layerId)
 
-    id1 = shapes[0]
-    for index in range(1, listlen(shapes)) :
-        id2 = nth(index, shapes)
-        idOr = dbLayerOr(layerId, id1, id2)
-        if index > 0 :
-            dbDeleteObject(id1)
-        id1 = idOr
+    idOr = fgOrList(ulist(shapes), layerId)
 
     return idOr
 
@@ -105,9 +101,7 @@ def dbLayerAndList(layerId, shapes):
     if type(layerId) == str :
         layerId = Layer(layerId)
 
-    idAnd = shapes[0]
-    for id in shapes[1:] :
-        idAnd = fgAnd(idAnd, id, layerId)
+    idAnd = fgAndList(ulist(shapes), layerId)
 
     return idAnd
 
@@ -198,6 +192,34 @@ def dbMoveFig(fig, pnt, rot) :
     if pnt :
         fig.moveBy(pnt.x, pnt.y)
 
+#***********************************************************************************************************************
+# dbLayerSelect
+#   Returns for each shape of idlist whether all its polygons are inside (isInside = True) respectively outside
+#   (isInside = False) the shape id, where the polygons may touch the boundary of id. The polygons of all shapes
+#   are tested with one pya.Region query against id.
+#***********************************************************************************************************************
+def dbLayerSelect(idlist, id, isInside):
+    reference = pya.Region()
+    id.addToRegion(reference, ShapeFilter())
+
+    # the candidates are taken as they are (not merged), so the query returns the polygons unchanged
+    candidates = pya.Region()
+    candidates.merged_semantics = False
+
+    itemPolygons = list()
+    for item in idlist :
+        itemRegion = pya.Region()
+        item.addToRegion(itemRegion, ShapeFilter())
+        itemPolygons.append([polygon for polygon in itemRegion.each()])
+        candidates.insert(itemRegion)
+
+    if isInside :
+        selected = set(candidates.inside(reference).each())
+    else :
+        selected = set(candidates.outside(reference).each())
+
+    return [len(polygons) > 0 and all(polygon in selected for polygon in polygons) for polygons in itemPolygons]
+
 #***********************************************************************************************************************
 # dbLayerInside
 #   layer - new layer for cloned shape
@@ -207,73 +229,29 @@ def dbLayerInside(self, layer, idlist, id):
     if type(layer) == str :
         layer = Layer(layer)
 
-    pnts = id.getPoints()
-
     mlist = list()
-    for item in idlist :
-        if type(item) == Rect :
-            if pnts.containsPoint(Point(item.left, item.bottom)) and pnts.containsPoint(Point(item.left, item.top)) and pnts.containsPoint(Point(item.right, item.bottom)) and pnts.containsPoint(Point(item.right, item.top)) :
-                it = item.clone()
-                it.layer = layer
-                mlist.append(it)
-        else :
-            pnts1 = item.getPoints()
-            yes = False
-            for pnt in pnts1 :
-                if pnts.containsPoint(pnt) :
-                    yes = True
-                else :
-                    yes = False
-                    break
-
-            if yes :
-                it = item.clone()
-                it.layer = layer
-                mlist.append(it)
-
-        #idOr = id.fgOr(item, layer)
-        #if len(idOr.getComps()) == 1 :
-        #    shape = idOr.getComp(0)
-        #    if shape.getNumPoints() == 3 :
-        #        mlist.append(item.clone())
-        #
-        #idOr.destroy()
+    for item, yes in zip(idlist, dbLayerSelect(idlist, id, True)) :
+        if yes :
+            it = item.clone()
+            it.layer = layer
+            mlist.append(it)
 
     return mlist
 
 #***********************************************************************************************************************
 # dbLayerOutside
+#   layer - new layer for cloned shape
 #***********************************************************************************************************************
 def dbLayerOutside(self, layer, idlist, id):
     if type(layer) == str :
         layer = Layer(layer)
 
-    if type(id) == Rect :
-        pnts = PointList([Point(id.left, id.bottom), Point(id.left, id.top), Point(id.right, id.bottom), Point(id.right, id.top)])
-    else :
-        pnts = id.getPoints()
-
     mlist = list()
-    for item in idlist :
-        if type(item) == Rect :
-            if pnts.containsPoint(Point(item.left, item.bottom)) and pnts.containsPoint(Point(item.left, item.top)) and pnts.containsPoint(Point(item.right, item.bottom)) and pnts.containsPoint(Point(item.right, item.top)) :
-                pass
-            else :
-                mlist.append(item.clone())
-        else :
-            pnts1 = item.getPoints()
-            yes = False
-            for pnt in pnts1 :
-                if pnts.containsPoint(pnt) :
-                    yes = False
-                    break
-                else :
-                    yes = True
-
-            if yes :
-                it = item.clone()
-                it.layer = layer
-                mlist.append(it)
+    for item, yes in zip(idlist, dbLayerSelect(idlist, id, False)) :
+        if yes :
+            it = item.clone()
+            it.layer = layer
+            mlist.append(it)
 
     return mlist
 
@@ -287,6 +265,34 @@ def dbCreateRect(self, layerId, bBox):
     rectId = Rect(layerId, bBox)
     return rectId
 
+#***********************************************************************************************************************
+# dbCreateRectArray
+#   boxes - list of (left, bottom, right, top) tuples
+#   Creates the rectangles as CellInstArrays if DloGen.rectArrays is set and they form a grid (see
+#   DloGen.createRectArray), otherwise one Rect each. Returns the list of created Rects, which is empty if the
+#   rectangles were created as CellInstArrays.
+#***********************************************************************************************************************
+def dbCreateRectArray(self, layerId, boxes):
+    if type(layerId) == str :
+        layerId = Layer(layerId)
+
+    if DloGen.rectArrays and self.createRectArray(layerId, boxes) :
+        return []
+
+    return [Rect(layerId, Box(left, bottom, right, top)) for left, bottom, right, top in boxes]
+
+#***********************************************************************************************************************
+# dbCreateRegion
+#   region - pya.Region in database units
+#   Creates the polygons of region as one Grouping, the region is inserted into the cell as a whole (see
+#   Grouping.fromRegion). The region is copied, so it may be reused.
+#***********************************************************************************************************************
+def dbCreateRegion(self, layerId, region):
+    if type(layerId) is str :
+        layerId = Layer(layerId)
+
+    return Grouping.fromRegion(region.dup(), layerId)
+
 #***********************************************************************************************************************
 # dbCreatePolygon
 #***********************************************************************************************************************
@@ -843,10 +849,11 @@ def DrawContArray(self, layer, bbox, size, space, over):
     yoff = (y2-y1-ymin)/2
     yoff = GridFix(yoff)
 
-    for j in range(int(yanz)):
-        for i in range(int(xanz)):
-            dbCreateRect(self, layer, Box(x1+xoff+over+(size+space)*i, y1+yoff+over+(size+space)*j,
-                                          x1+xoff+over+(size+space)*i+size, y1+yoff+over+(size+space)*j+size))
+    xs = gridLinear(x1+xoff+over, size+space, int(xanz))
+    ys = gridLinear(y1+yoff+over, size+space, int(yanz))
+    xrs = gridAdd(xs, size)
+    yrs = gridAdd(ys, size)
+    dbCreateRectArray(self, layer, [(x, y, xr, yr) for y, yr in zip(ys, yrs) for x, xr in zip(xs, xrs)])
 
     return Box(x1+xoff+over, y1+yoff+over,
                x1+xoff+over+xanz*size+(xanz-1)*space,
@@ -854,6 +861,8 @@ def DrawContArray(self, layer, bbox, size, space, over):
 
 #***********************************************************************************************************************
 # contactArray
+#   Returns the created Rects. The contacts are created by dbCreateRectArray, so if they are created as CellInstArray
+#   they have no Rects and aren't included in the returned list.
 #***********************************************************************************************************************
 def contactArray(self, pathLayer, contLayer, xl, yl, xh, yh, ox, oy, ws, ds):
     eps = self.tech.getTechParams()['epsilon1']
@@ -892,20 +901,21 @@ def contactArray(self, pathLayer, contLayer, xl, yl, xh, yh, ox, oy, ws, ds):
     if pathLayer :
         mlist.append(dbCreateRect(self, pathLayer, Box(xl, yl, xh, yh)))
 
-    for i in range(int(nx)) :
-    #for(i=1; i<=nx; i++) {
-        y = 0
-        if ny == 1 :
-            y = (h-ws)/2
-        else :
-            y = oy
+    y = 0
+    if ny == 1 :
+        y = (h-ws)/2
+    else :
+        y = oy
 
-        for j in range(int(ny)) :
-        #for(j=1; j<=ny; j++) {
-            mlist.append(dbCreateRect(self, contLayer, Box(xl+tog(x), yl+tog(y), xl+tog(x+ws), yl+tog(y+ws))))
-            y = y+ws+dsy
+    xs = gridAccumulate(x, (ws, dsx), nx)
+    ys = gridAccumulate(y, (ws, dsy), ny)
+    xls = gridAdd(gridSnap(xs), xl)
+    xhs = gridAdd(gridSnap(gridAdd(xs, ws)), xl)
+    yls = gridAdd(gridSnap(ys), yl)
+    yhs = gridAdd(gridSnap(gridAdd(ys, ws)), yl)
 
-        x = x+ws+dsx
+    mlist.extend(dbCreateRectArray(self, contLayer, [(left, bottom, right, top) for left, right in zip(xls, xhs)
+                                                                                for bottom, top in zip(yls, yhs)]))
 
     if pathLayer :
         mlist.append(dbCreateRect(self, pathLayer, Box(xl, yl, xh, yh)))
@@ -1015,8 +1025,9 @@ def DrawContRowMid(self, layer, x0, y0, x1, y1, size, space, drawMid, GRID, EPSI
       x0 = Snap(x0+(xShift*ovhd/2))
       y0 = Snap(y0+(yShift*ovhd/2))
 
-    for i in range (anz):
-      dbCreateRect(self, layer, Box(xofs+x0+dx*i, yofs+y0+dy*i, xofs+x0+dx*i+size, yofs+y0+dy*i+size))
+    xs = gridLinear(xofs+x0, dx, anz)
+    ys = gridLinear(yofs+y0, dy, anz)
+    dbCreateRectArray(self, layer, [(x, y, xr, yr) for x, y, xr, yr in zip(xs, ys, gridAdd(xs, size), gridAdd(ys, size))])
 
 #***********************************************************************************************************************
 # myBox: safe version of Box that works with x2,y2 smaller also
@@ -1073,6 +1084,7 @@ def DrawFillers(self, layer, xl, yl, xh, yh, ws, hs, dx, dy, dir, offset, retlis
         layer = Layer(layer)
 
     idlist = list()
+    boxes = list()
     W = xh-xl
     H = yh-yl
     nry = floor((H+dy)/(hs+dy))
@@ -1100,49 +1112,47 @@ def DrawFillers(self, layer, xl, yl, xh, yh, ws, hs, dx, dy, dir, offset, retlis
         else :
             off = 0.
 
-        y = yl
+        togys = gridSnap(gridAccumulate(yl, (hns, hs), nry))
+        togxs = gridSnap(gridAccumulate(xl, (wns, ws), nrx))
+        if offset != 0 and nrx > 1 :
+            offTogxs = gridSnap(gridAccumulate(xl+off, (wns, ws), nrx-1))
+
         for i in range(1, int(nry)+1) :
-            togy = tog(y)
-            x = xl
-            nr = nrx
-            if offset != 0 and evenp(i+offset-1) and nr > 1 :
-                nr = nr-1
-                x = x+off
-
-            for j in range(1, int(nr)+1) :
-                togx = tog(x)
-                id = dbCreateRect(self, layer, Box(togx, togy, togx+ws, togy+hs))
-                if retlist :
-                    cons(idlist, id)
-                x = x+wns+ws
-
-            y = y+hns+hs
+            togy = togys[i-1]
+            rowTogxs = togxs
+            if offset != 0 and evenp(i+offset-1) and nrx > 1 :
+                rowTogxs = offTogxs
+
+            boxes.extend([(togx, togy, togx+ws, togy+hs) for togx in rowTogxs])
 
     else : # column-wise
         if offset > 0 :
             off = (hs+dy)*0.5
         else :
             0
-        x = xl
+        togxs = gridSnap(gridAccumulate(xl, (wns, ws), nrx))
+        togys = gridSnap(gridAccumulate(yl, (hns, hs), nry))
+        offTogys = None
+
         for i in range(1, int(nrx)+1) :
-            togx = tog(x)
-            y = yl
-            nr = nry
+            togx = togxs[i-1]
+            columnTogys = togys
             if offset != 0 and evenp(i+offset-1) :
-                nr = nr-1
-                y = y+off
-
-            for j in range(1, int(nr)+1) :
-                togy = tog(y)
-                id = dbCreateRect(self, layer, Box(togx, togy, togx+ws, togy+hs))
-                if retlist :
-                    cons(idlist, id)
-                y = y+hns+hs
+                if offTogys is None :
+                    offTogys = gridSnap(gridAccumulate(yl+off, (hns, hs), nry-1))
+                columnTogys = offTogys
 
-            x = x+wns+ws
+            boxes.extend([(togx, togy, togx+ws, togy+hs) for togy in columnTogys])
 
     # if
 
+    if retlist :
+        # the Rects are returned in reverse order of creation, as built by cons() before
+        idlist = [dbCreateRect(self, layer, Box(*box)) for box in boxes]
+        idlist.reverse()
+    else :
+        dbCreateRectArray(self, layer, boxes)
+
     return idlist
 
 #***********************************************************************************************************************
@@ -0,0 +1,115 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+# Grid emission: computes the coordinates of regular rows/arrays of rectangles (contacts, fillers)
+# at once. With NumPy installed, long rows are computed as arrays, otherwise in plain Python. Both
+# give the same values as the scalar code they replace: coordinates are accumulated step by step
+# in the same order of additions, and the snapping is the one of GridFix.
+
+from .utility_functions import SG13_GRID, SG13_IGRID, SG13_EPSILON
+
+import math
+
+# rows shorter than this are computed in plain Python, as NumPy doesn't pay off for them
+GRID_NUMPY_MIN_COUNT = 32
+
+# NumPy module once imported, None if it isn't installed (see gridNumpy)
+_numpy = False
+
+#***********************************************************************************************************************
+# gridNumpy
+#   Returns the NumPy module for a row of count values, or None if the row is computed in plain Python.
+#   NumPy is imported on the first long row only, as importing it takes longer than loading the library.
+#***********************************************************************************************************************
+def gridNumpy(count):
+    global _numpy
+
+    if count < GRID_NUMPY_MIN_COUNT :
+        return None
+
+    if _numpy is False :
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = None
+
+    return _numpy
+
+#***********************************************************************************************************************
+# gridAccumulate
+#   Returns the count values start, start+steps[0]+steps[1]+..., ... as computed by the loop
+#       x = start
+#       for i in range(count) : values.append(x); x = x+steps[0]+steps[1]+...
+#***********************************************************************************************************************
+def gridAccumulate(start, steps, count):
+    count = max(int(count), 0)
+    if count == 0 :
+        return []
+
+    numpy = gridNumpy(count)
+    if numpy is not None :
+        # add.accumulate adds sequentially, so the rounding is the one of the loop above
+        increments = numpy.empty(1 + (count - 1) * len(steps))
+        increments[0] = start
+        for i, step in enumerate(steps) :
+            increments[1 + i::len(steps)] = step
+        return numpy.add.accumulate(increments)[::len(steps)].tolist()
+
+    values = list()
+    x = start
+    for i in range(count) :
+        values.append(x)
+        for step in steps :
+            x = x+step
+    return values
+
+#***********************************************************************************************************************
+# gridLinear
+#   Returns the count values base+step*i for i in 0...count-1
+#***********************************************************************************************************************
+def gridLinear(base, step, count):
+    count = max(int(count), 0)
+
+    numpy = gridNumpy(count)
+    if numpy is not None :
+        return (base + step * numpy.arange(count, dtype=numpy.float64)).tolist()
+
+    return [base+step*i for i in range(count)]
+
+#***********************************************************************************************************************
+# gridSnap
+#   Returns GridFix applied to each of the values
+#***********************************************************************************************************************
+def gridSnap(values):
+    numpy = gridNumpy(len(values))
+    if numpy is not None :
+        return (numpy.floor(numpy.asarray(values) * SG13_IGRID + SG13_EPSILON) * SG13_GRID).tolist()
+
+    return [math.floor(x*SG13_IGRID+SG13_EPSILON)*SG13_GRID for x in values]
+
+#***********************************************************************************************************************
+# gridAdd
+#   Returns value+offset for each of the values
+#***********************************************************************************************************************
+def gridAdd(values, offset):
+    numpy = gridNumpy(len(values))
+    if numpy is not None :
+        return (numpy.asarray(values) + offset).tolist()
+
+    return [x+offset for x in values]
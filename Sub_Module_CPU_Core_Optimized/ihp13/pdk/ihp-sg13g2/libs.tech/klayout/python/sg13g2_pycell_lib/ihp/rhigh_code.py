@@ -285,8 +285,7 @@ class rhigh(DloGen):
             # can only be in internal version
             dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+(contactpush+li_salblock+li_poly_over)*dir, xpos2-contbar_poly_over, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir))
         else :
-            for i in range(ncont) :
-                dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc, ypos2+(contactpush+li_salblock+li_poly_over)*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir))
+            dbCreateRectArray(self, locintlayer, [(xpos1+polyover+distr+i*distc, ypos2+(contactpush+li_salblock+li_poly_over)*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir) for i in range(ncont)])
                 
         # 26.6.08 GG: new metal block   
         dbCreateRect(self, metlayer, Box(xpos1+contbar_poly_over-endcap, ypos2+(contactpush+li_salblock+li_poly_over-metover)*dir, xpos2-contbar_poly_over+endcap, ypos2+(contactpush+consize+li_salblock+li_poly_over+metover)*dir))
@@ -457,15 +456,15 @@ class rhigh(DloGen):
         # 10.12.07 GGa added internal code block
         if drawbar :
             # can only be in internal version
-            lastCont = dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir, xpos2-contbar_poly_over, ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir))
+            bBox = dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir, xpos2-contbar_poly_over, ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir)).getBBox()
         else :
-            for i in range(ncont) :
-                lastCont = dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc, ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir))
+            boxes = [(xpos1+polyover+distr+i*distc, ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir) for i in range(ncont)]
+            dbCreateRectArray(self, locintlayer, boxes)
+            bBox = Box(*boxes[-1])
                 
         # 26.6.08 GG: new metal block
         # *********************************************************
         # Metal and pin
-        bBox = lastCont.getBBox()
         dbCreateRect(self, metlayer, Box(bBox.left-endcap, bBox.bottom-endcap, bBox.right+endcap, bBox.top+endcap))
     
         MkPin(self, 'MINUS', 2, Box(bBox.left-endcap, bBox.bottom-endcap, bBox.right+endcap, bBox.top+endcap), metlayer)
@@ -261,9 +261,9 @@ class rppd(DloGen):
             dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+(contactpush+li_salblock+li_poly_over)*dir,
                                                 xpos2-contbar_poly_over, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir))
         else :
-            for i in range(int(ncont)):
-                dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc, ypos2+(contactpush+li_salblock+li_poly_over)*dir,
-                                                    xpos1+polyover+distr+i*distc+consize, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir))
+            dbCreateRectArray(self, locintlayer, [(xpos1+polyover+distr+i*distc, ypos2+(contactpush+li_salblock+li_poly_over)*dir,
+                                                   xpos1+polyover+distr+i*distc+consize, ypos2+(contactpush+consize+li_salblock+li_poly_over)*dir)
+                                                  for i in range(int(ncont))])
 
         # **************************************************************
         # Metal and pin
@@ -426,11 +426,11 @@ class rppd(DloGen):
             dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+(contactpush+li_salblock+li_poly_over+lcor)*dir,
                                                 xpos2-contbar_poly_over, ypos2+(contactpush+consize+li_salblock+li_poly_over+lcor)*dir))
         else :
-            for i in range(ncont):
-                dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc,
-                                                    ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir,
-                                                    xpos1+polyover+distr+i*distc+consize,
-                                                    ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir))
+            dbCreateRectArray(self, locintlayer, [(xpos1+polyover+distr+i*distc,
+                                                   ypos2+(lcor+contactpush+li_salblock+li_poly_over)*dir,
+                                                   xpos1+polyover+distr+i*distc+consize,
+                                                   ypos2+(lcor+contactpush+consize+li_salblock+li_poly_over)*dir)
+                                                  for i in range(ncont)])
         # **************************************************************
         # Metal and Pin
 
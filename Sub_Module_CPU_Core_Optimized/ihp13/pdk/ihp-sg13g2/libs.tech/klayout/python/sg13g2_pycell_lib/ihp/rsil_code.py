@@ -200,8 +200,7 @@ class rsil(DloGen):
             # can only be in internal PCell
             dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+li_poly_over*dir, xpos2-contbar_poly_over, ypos2+(consize+li_poly_over)*dir))
         else :
-            for i in range(ncont) :
-                dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc, ypos2+li_poly_over*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(consize+li_poly_over)*dir))
+            dbCreateRectArray(self, locintlayer, [(xpos1+polyover+distr+i*distc, ypos2+li_poly_over*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(consize+li_poly_over)*dir) for i in range(ncont)])
                 
         # **************************************************************
         # draw MetalRect and Pin of bottom Contact Area    
@@ -279,8 +278,7 @@ class rsil(DloGen):
         if drawbar :
             dbCreateRect(self, locintlayer, Box(xpos1+contbar_poly_over, ypos2+li_poly_over*dir, xpos2-contbar_poly_over, ypos2+(consize+li_poly_over)*dir))
         else :
-            for i in range(ncont) :
-                dbCreateRect(self, locintlayer, Box(xpos1+polyover+distr+i*distc, ypos2+li_poly_over*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(consize+li_poly_over)*dir))
+            dbCreateRectArray(self, locintlayer, [(xpos1+polyover+distr+i*distc, ypos2+li_poly_over*dir, xpos1+polyover+distr+i*distc+consize, ypos2+(consize+li_poly_over)*dir) for i in range(ncont)])
                 
         # **************************************************************
         #  Metal and Pin Part
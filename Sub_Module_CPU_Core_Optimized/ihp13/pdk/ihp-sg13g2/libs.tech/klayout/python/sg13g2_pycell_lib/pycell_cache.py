@@ -0,0 +1,219 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+"""
+Persistent on-disk cache for preprocessed PyCell modules.
+
+For every PyCell module using conditional compilation the bytecode compiled from the preprocessed
+source is stored in a cache directory. An entry is keyed by the hash of the original module
+source, the set of defines considered as 'defined' and the running Python/preprocessor versions,
+so a changed module or a changed define set simply maps to a new entry.
+
+The cache directory is chosen as follows:
+  1. The directory given by the environment variable 'IHP_PYCELL_LIB_CACHE_DIR', or
+  2. 'ihp_pycell_lib' below the Python bytecode cache prefix (PYTHONPYCACHEPREFIX), or
+  3. a per-user directory inside the system temp directory.
+
+Besides the code, the cache holds the pre-parsed technology snapshot (see sg13_tech.py) and the
+PCell parameter manifest used for the lazy registration of the PyCells (see PyCellLib). The manifest
+is keyed by all PyCell sources, the technology file and the set of defines.
+
+Setting the environment variable 'IHP_PYCELL_LIB_NO_CACHE' disables the cache.
+
+"""
+
+import os
+import sys
+import json
+import hashlib
+import marshal
+import tempfile
+import importlib.util
+
+CACHE_FORMAT_VERSION = 2
+
+
+def hashFiles(paths: list) -> bytes:
+    """
+    Returns the SHA-256 digest of the names and the content of the files 'paths'.
+
+    """
+    hash = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            hash.update(os.path.basename(path).encode() + b'\0')
+            hash.update(hashlib.sha256(file.read()).digest())
+    return hash.digest()
+
+
+class PyCellCodeCache(object):
+
+    def __init__(self, cacheDir: str, salt: str = ''):
+        self._cacheDir = cacheDir
+        self._salt = salt
+
+    @classmethod
+    def fromEnvironment(cls, salt: str = ''):
+        """
+        Returns the cache configured by the environment, or None if caching is disabled or the
+        cache directory can't be used.
+
+        """
+        if os.getenv('IHP_PYCELL_LIB_NO_CACHE') is not None:
+            return None
+
+        cacheDir = os.getenv('IHP_PYCELL_LIB_CACHE_DIR')
+        if cacheDir is None:
+            if sys.pycache_prefix is not None:
+                cacheDir = os.path.join(sys.pycache_prefix, 'ihp_pycell_lib')
+            else:
+                userId = os.getuid() if hasattr(os, 'getuid') else os.getenv('USERNAME', 'user')
+                cacheDir = os.path.join(tempfile.gettempdir(), f"ihp_pycell_lib_{userId}")
+
+        try:
+            os.makedirs(cacheDir, mode=0o700, exist_ok=True)
+        except OSError:
+            return None
+
+        # never execute code from a cache directory which is owned by someone else
+        if hasattr(os, 'getuid') and os.stat(cacheDir).st_uid != os.getuid():
+            return None
+
+        return cls(cacheDir, salt)
+
+    @property
+    def cacheDir(self) -> str:
+        return self._cacheDir
+
+    def key(self, source: bytes, defines: list) -> str:
+        """
+        Returns the cache key for the module source 'source' preprocessed with 'defines'.
+
+        """
+        hash = hashlib.sha256()
+        hash.update(importlib.util.MAGIC_NUMBER)
+        hash.update(f"{CACHE_FORMAT_VERSION}:{self._salt}".encode())
+        hash.update(source)
+        for define in sorted(set(defines)):
+            hash.update(b'\0' + define.encode())
+        return hash.hexdigest()
+
+    def filesKey(self, paths: list, defines: list) -> str:
+        """
+        Returns the cache key for the content of the files 'paths' combined with 'defines'.
+
+        """
+        return self.key(hashFiles(paths), defines)
+
+    def codePath(self, moduleName: str, key: str) -> str:
+        return os.path.join(self._cacheDir, f"{moduleName}-{key[:24]}.code")
+
+    def load(self, moduleName: str, key: str):
+        """
+        Returns the cached code object for the given entry, or None on a cache miss.
+
+        """
+        try:
+            with open(self.codePath(moduleName, key), 'rb') as codeFile:
+                return marshal.load(codeFile)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def tempPath(self, name: str, suffix: str) -> str:
+        """
+        Returns a fresh file name inside the cache directory, used for writing entries atomically.
+
+        """
+        fd, path = tempfile.mkstemp(prefix=f".{name}-", suffix=suffix, dir=self._cacheDir)
+        os.close(fd)
+        return path
+
+    def store(self, moduleName: str, key: str, code):
+        """
+        Stores the code object 'code' for the given entry.
+
+        The file is written atomically, so concurrent writers of the same entry are safe.
+
+        """
+        tmpCodePath = None
+        try:
+            tmpCodePath = self.tempPath(moduleName, '.code')
+            with open(tmpCodePath, 'wb') as codeFile:
+                marshal.dump(code, codeFile)
+            os.replace(tmpCodePath, self.codePath(moduleName, key))
+        except (OSError, ValueError):
+            if tmpCodePath is not None and os.path.exists(tmpCodePath):
+                os.remove(tmpCodePath)
+
+    def manifestPath(self, key: str) -> str:
+        return os.path.join(self._cacheDir, f"pcell_manifest-{key[:24]}.json")
+
+    def loadManifest(self, key: str):
+        """
+        Returns the cached PCell parameter manifest for 'key', or None on a cache miss.
+
+        """
+        try:
+            with open(self.manifestPath(key), 'r') as manifestFile:
+                return json.load(manifestFile)
+        except (OSError, ValueError):
+            return None
+
+    def storeManifest(self, key: str, manifest: dict):
+        """
+        Stores the PCell parameter manifest 'manifest' atomically for 'key'.
+
+        """
+        tmpManifestPath = None
+        try:
+            tmpManifestPath = self.tempPath('pcell_manifest', '.json')
+            with open(tmpManifestPath, 'w') as manifestFile:
+                json.dump(manifest, manifestFile)
+            os.replace(tmpManifestPath, self.manifestPath(key))
+        except (OSError, TypeError, ValueError):
+            if tmpManifestPath is not None and os.path.exists(tmpManifestPath):
+                os.remove(tmpManifestPath)
+
+    def snapshotPath(self, name: str, key: str) -> str:
+        return os.path.join(self._cacheDir, f"{name}-{key[:24]}.marshal")
+
+    def loadSnapshot(self, name: str, key: str):
+        """
+        Returns the snapshot 'name' stored for 'key', or None on a cache miss.
+
+        """
+        try:
+            with open(self.snapshotPath(name, key), 'rb') as snapshotFile:
+                return marshal.load(snapshotFile)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def storeSnapshot(self, name: str, key: str, snapshot):
+        """
+        Stores 'snapshot', consisting of plain Python values, atomically as 'name' for 'key'.
+
+        """
+        tmpSnapshotPath = None
+        try:
+            tmpSnapshotPath = self.tempPath(name, '.marshal')
+            with open(tmpSnapshotPath, 'wb') as snapshotFile:
+                marshal.dump(snapshot, snapshotFile)
+            os.replace(tmpSnapshotPath, self.snapshotPath(name, key))
+        except (OSError, ValueError):
+            if tmpSnapshotPath is not None and os.path.exists(tmpSnapshotPath):
+                os.remove(tmpSnapshotPath)
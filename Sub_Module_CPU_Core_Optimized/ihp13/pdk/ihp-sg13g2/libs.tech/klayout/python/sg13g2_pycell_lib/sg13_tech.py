@@ -22,7 +22,9 @@ import pya
 
 import os
 import json
-from xml.dom import minidom
+from xml.etree import ElementTree
+
+from .pycell_cache import PyCellCodeCache
 
 class SG13_Tech(TechImpl):
 
@@ -36,16 +38,6 @@ class SG13_Tech(TechImpl):
 
         techFilePath = os.path.join(os.path.dirname(__file__), jsonTechFile)
 
-        with open(techFilePath, "r") as tech_file:
-            jsData = json.load(tech_file)
-            self._techParams = jsData["techParams"]
-
-            layers = jsData["Layers"]
-            self._layers = {}
-            for key, value in layers.items():
-                layer, dataType = value.split(',')
-                self._layers[key] = (int(layer.strip()), int(dataType.strip()))
-
         lypFilePath = ''
 
         lypFileEnv = os.getenv('KLAYOUT_LYP_FILE')
@@ -56,25 +48,26 @@ class SG13_Tech(TechImpl):
             lypFile = techName + lypSuffix
             lypFilePath = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'tech', lypFile))
 
-        if os.path.exists(lypFilePath):
-            dom = minidom.parse(lypFilePath)
-            layerProperties = dom.getElementsByTagName('layer-properties')[0].getElementsByTagName('properties')
+        codeCache = PyCellCodeCache.fromEnvironment()
+        snapshotKey = None
+        snapshot = None
 
-            if len(layerProperties) > 0:
-                baseLayerNames = {}
-                self._layers = {}
+        if codeCache is not None:
+            snapshotKey = codeCache.key(self._fileStamp(techFilePath) + self._fileStamp(lypFilePath), [])
+            snapshot = codeCache.loadSnapshot('sg13g2_tech', snapshotKey)
 
-                for layerProperty in layerProperties:
-                    name = layerProperty.getElementsByTagName('name')[0].firstChild.nodeValue
-                    layer, dataType = layerProperty.getElementsByTagName('source')[0].firstChild.nodeValue.split('/')
-                    self._layers[name] = (int(layer.strip()), int(dataType.strip()))
+        if snapshot is not None:
+            self._techParams, self._layers = snapshot
+        else:
+            self._readTechFile(techFilePath)
 
-                    baseLayerNames[name.split('.')[0]] = int(layer.strip())
+            if os.path.exists(lypFilePath):
+                self._readLayerPropertiesFile(lypFilePath)
 
-                for baseLayerName, layer in baseLayerNames.items():
-                    self._layers[baseLayerName] = (layer, 0)
+            if codeCache is not None:
+                codeCache.storeSnapshot('sg13g2_tech', snapshotKey, (self._techParams, self._layers))
 
-        else:
+        if not os.path.exists(lypFilePath):
             pya.Logger.warn(f"Layer property file '{lypFilePath}' don't exists, use default properties")
 
         if techNameParam not in self._techParams:
@@ -86,6 +79,49 @@ class SG13_Tech(TechImpl):
             if name.casefold() == techName.casefold():
                 self._dataBaseUnits = pya.Technology.technology_by_name(name).dbu
 
+    def _fileStamp(self, path):
+        try:
+            stat = os.stat(path)
+            return f"{path}:{stat.st_mtime_ns}:{stat.st_size}\0".encode()
+        except OSError:
+            return f"{path}:-\0".encode()
+
+    def _readTechFile(self, techFilePath):
+        with open(techFilePath, "r") as tech_file:
+            jsData = json.load(tech_file)
+            self._techParams = jsData["techParams"]
+
+            layers = jsData["Layers"]
+            self._layers = {}
+            for key, value in layers.items():
+                layer, dataType = value.split(',')
+                self._layers[key] = (int(layer.strip()), int(dataType.strip()))
+
+    def _readLayerPropertiesFile(self, lypFilePath):
+        layers = {}
+        baseLayerNames = {}
+        depth = 0
+
+        # stream the file, only the top-level 'properties' elements are of interest
+        for event, element in ElementTree.iterparse(lypFilePath, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                continue
+
+            depth -= 1
+            if depth == 1 and element.tag == 'properties':
+                name = element.find('name').text
+                layer, dataType = element.find('source').text.split('/')
+                layers[name] = (int(layer.strip()), int(dataType.strip()))
+
+                baseLayerNames[name.split('.')[0]] = int(layer.strip())
+                element.clear()
+
+        if len(layers) > 0:
+            for baseLayerName, layer in baseLayerNames.items():
+                layers[baseLayerName] = (layer, 0)
+            self._layers = layers
+
     def name(self):
         return "SG13_dev"
 
@@ -0,0 +1,176 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+"""
+Tracing of the PyCell library startup.
+
+If the environment variable 'IHP_PYCELL_LIB_TRACE' is set to a file name, the wall time and the
+memory allocated (via tracemalloc) of every startup phase are recorded and written to this file
+once the library is registered. The environment variable 'IHP_PYCELL_LIB_TRACE_FORMAT' selects the
+format:
+  json   : list of phases with start/duration in microseconds and allocated/peak bytes (default)
+  chrome : Chrome trace event format, to be opened with chrome://tracing or Perfetto
+
+An invalid format or a trace file that can't be written turns tracing off with a warning, tracing
+never stops the library from loading.
+
+Phases running in worker threads are recorded with their thread id; their allocations overlap with
+those of concurrently running phases. The peak of a phase includes the peaks of the phases nested
+in it.
+
+"""
+
+import pya
+
+import os
+import json
+import time
+import threading
+import functools
+import contextlib
+import tracemalloc
+
+
+class StartupTrace(object):
+
+    def __init__(self, path: str = None, format: str = 'json'):
+        self._path = path
+        self._format = format
+        self._phases = []
+        self._openPhases = []
+        self._lock = threading.Lock()
+        self._startedTracemalloc = False
+
+        if path is not None:
+            if format not in ('json', 'chrome'):
+                pya.Logger.warn(f"Invalid trace format '{format}', expected 'json' or 'chrome', startup tracing is off")
+                self._path = None
+            elif not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._startedTracemalloc = True
+
+        self._startTime = time.perf_counter_ns()
+
+    @classmethod
+    def fromEnvironment(cls):
+        return cls(os.getenv('IHP_PYCELL_LIB_TRACE'), os.getenv('IHP_PYCELL_LIB_TRACE_FORMAT', 'json'))
+
+    def phase(self, name: str, module: str = None):
+        """
+        Returns a context manager recording the phase 'name', optionally for the module 'module'.
+
+        """
+        if self._path is None:
+            return contextlib.nullcontext()
+        return self._tracePhase(name, module)
+
+    def traced(self, name: str):
+        """
+        Returns a decorator recording each call of the decorated function as phase 'name'.
+
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.phase(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _carryPeak(self):
+        # tracemalloc keeps a single peak, which is carried over to all phases in progress before
+        # a nested phase resets it
+        _, peakMemory = tracemalloc.get_traced_memory()
+        for openPhase in self._openPhases:
+            openPhase['peak'] = max(openPhase['peak'], peakMemory)
+
+    @contextlib.contextmanager
+    def _tracePhase(self, name, module):
+        with self._lock:
+            startMemory, _ = tracemalloc.get_traced_memory()
+            self._carryPeak()
+            openPhase = {'peak': startMemory}
+            self._openPhases.append(openPhase)
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            with self._lock:
+                endMemory, _ = tracemalloc.get_traced_memory()
+                self._carryPeak()
+                self._openPhases.remove(openPhase)
+            peakMemory = openPhase['peak']
+            self._phases.append({
+                'name': name,
+                'module': module,
+                'thread': threading.get_ident(),
+                'start_us': (start - self._startTime) / 1000,
+                'duration_us': (end - start) / 1000,
+                'allocated_bytes': endMemory - startMemory,
+                'peak_bytes': max(peakMemory - startMemory, 0)
+            })
+
+    def write(self):
+        """
+        Writes the recorded phases and stops tracing the memory allocations.
+
+        """
+        if self._path is None:
+            return
+
+        if self._format == 'chrome':
+            events = []
+            for phase in self._phases:
+                name = phase['name'] if phase['module'] is None else f"{phase['name']} ({phase['module']})"
+                events.append({
+                    'name': name,
+                    'cat': 'pycell',
+                    'ph': 'X',
+                    'ts': phase['start_us'],
+                    'dur': phase['duration_us'],
+                    'pid': os.getpid(),
+                    'tid': phase['thread'],
+                    'args': {
+                        'allocated_bytes': phase['allocated_bytes'],
+                        'peak_bytes': phase['peak_bytes']
+                    }
+                })
+            trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        else:
+            trace = {
+                'total_us': (time.perf_counter_ns() - self._startTime) / 1000,
+                'phases': self._phases
+            }
+
+        try:
+            with open(self._path, 'w') as traceFile:
+                json.dump(trace, traceFile, indent=1)
+        except OSError as error:
+            pya.Logger.warn(f"Can't write the startup trace to '{self._path}': {error}")
+
+        if self._startedTracemalloc:
+            tracemalloc.stop()
+            self._startedTracemalloc = False
+
+        self._path = None
+
+
+startupTrace = StartupTrace.fromEnvironment()
@@ -0,0 +1,100 @@
+########################################################################
+#
+# Copyright 2024 IHP PDK Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+########################################################################
+
+# Tests of the caches of produced layouts, requires the klayout Python module.
+#
+# To run this code, use (in the location of this file):
+#
+# python -m unittest pycell_cache_test
+
+import os
+import sys
+import stat
+import tempfile
+import unittest
+
+pythonPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python')
+sys.path.append(pythonPath)
+sys.path.append(os.path.join(pythonPath, 'pycell4klayout-api', 'source', 'python'))
+
+import pya
+
+# registers the SG13_dev library
+import sg13g2_pycell_lib
+
+from cni.dlo import PCellGeometryCache
+from cni.variantstore import PCellVariantStore
+
+
+class PCellGeometryCacheTest(unittest.TestCase):
+
+    def paramDecls(self):
+        return [pya.PCellParameterDeclaration('w', pya.PCellParameterDeclaration.TypeDouble, 'Width', 1e-6),
+                pya.PCellParameterDeclaration('ng', pya.PCellParameterDeclaration.TypeString, 'Number of Gates', '1')]
+
+    def testDoubleParamsAreNormalized(self):
+        self.assertEqual(PCellGeometryCache.canonicalParams(self.paramDecls(), [2e-6, '2']),
+                         PCellGeometryCache.canonicalParams(self.paramDecls(), [2.0000000000001e-6, '2']))
+
+    def testStringParamsAreExact(self):
+        self.assertNotEqual(PCellGeometryCache.canonicalParams(self.paramDecls(), [2e-6, '2']),
+                            PCellGeometryCache.canonicalParams(self.paramDecls(), [2e-6, '2.0']))
+
+    def testNumericParamsAreNormalized(self):
+        self.assertEqual(PCellGeometryCache.canonicalParams(self.paramDecls(), [2e-6, '2'], ('ng',)),
+                         PCellGeometryCache.canonicalParams(self.paramDecls(), [2e-6, '2.0'], ('ng',)))
+
+    def testCachedLayoutIsNotReplayedForEquivalentString(self):
+        layout = pya.Layout()
+
+        cell = layout.create_cell('nmos', 'SG13_dev', {'ng': '2'})
+        self.assertFalse(cell.bbox().empty())
+
+        # int('2.0') fails, so this variant stays empty whether or not ng='2' was produced before
+        cell = layout.create_cell('nmos', 'SG13_dev', {'ng': '2.0'})
+        self.assertTrue(cell.bbox().empty())
+
+
+class PCellVariantStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self._storeDir = tempfile.TemporaryDirectory()
+        self._umask = os.umask(0o022)
+
+    def tearDown(self):
+        os.umask(self._umask)
+        self._storeDir.cleanup()
+
+    def testStoredVariantIsReadableByOthers(self):
+        layout = pya.Layout()
+        cell = layout.create_cell('VARIANT')
+        cell.shapes(layout.layer(1, 0)).insert(pya.Box(0, 0, 100, 100))
+
+        store = PCellVariantStore(self._storeDir.name, 'test')
+        key = store.key('VARIANT', layout.dbu, ())
+        store.save('VARIANT', key, cell)
+
+        self.assertEqual(stat.S_IMODE(os.stat(store.path('VARIANT', key)).st_mode), 0o644)
+
+        loadedCell = layout.create_cell('LOADED')
+        self.assertTrue(store.load('VARIANT', key, loadedCell))
+        self.assertEqual(loadedCell.bbox(), cell.bbox())
+
+
+if __name__ == '__main__':
+    unittest.main()